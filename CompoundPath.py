@@ -0,0 +1,57 @@
+from inkex.elements import PathElement
+
+
+class CompoundPath:
+    """
+    Collects straight segments as the M…L subpaths of a few compound paths.
+
+    The path data is built as a list of strings and joined once per path,
+    so thousands of segments become a handful of elements instead of one
+    element each. Optionally the segment index of every subpath is kept and
+    written to the data-segments attribute of its path, so a subpath can be
+    traced back to the segment it was drawn for.
+
+    Args:
+        keep_ids (bool): Whether to record the segment index of every subpath.
+        max_segments (int): The largest number of subpaths in one path.
+
+    Attributes:
+        parts (list): The "M x,y L x,y" data of every subpath.
+        indices (list): The segment index of every subpath, if kept.
+
+    Methods:
+        add(x1, y1, x2, y2, index): Adds a segment as a subpath.
+        elements(id_prefix, style): Returns the compound path elements.
+    """
+
+    def __init__(self, keep_ids=False, max_segments=5000):
+        self.keep_ids = keep_ids
+        self.max_segments = max_segments
+        self.parts = []
+        self.indices = []
+
+    def __len__(self):
+        return len(self.parts)
+
+    def add(self, x1, y1, x2, y2, index=None):
+        """Add a segment from (x1, y1) to (x2, y2) as a subpath."""
+        self.parts.append(f"M {x1:.3f},{y1:.3f} L {x2:.3f},{y2:.3f}")
+        if self.keep_ids:
+            self.indices.append(len(self.indices) if index is None else index)
+
+    def elements(self, id_prefix, style=None):
+        """Return one path element per max_segments subpaths, styled if given."""
+        elements = []
+        for number, start in enumerate(range(0, len(self.parts), self.max_segments), 1):
+            stop = start + self.max_segments
+            element = PathElement(id=f"{id_prefix}_{number}")
+            if style:
+                element.set("style", style)
+            # The data is already valid path data, so skip parsing it into a Path
+            element.set("d", " ".join(self.parts[start:stop]))
+            if self.keep_ids:
+                element.set(
+                    "data-segments", " ".join(map(str, self.indices[start:stop]))
+                )
+            elements.append(element)
+        return elements
@@ -0,0 +1,54 @@
+# Remembers that an id was not found in the document
+MISSING = object()
+
+
+class ElementRegistry:
+    """
+    Direct references to the elements of a run, keyed by their id.
+
+    Elements are registered as they are created, so later lookups are a dict
+    access instead of a search through the document. Ids that were not
+    registered are looked up in the document once and remembered, also when
+    they are missing, so an element added to the document after a failed
+    lookup has to be registered to be found.
+
+    Args:
+        svg (SvgDocumentElement): The document the elements belong to.
+
+    Attributes:
+        svg (SvgDocumentElement): The document the elements belong to.
+        elements (dict): Maps element ids to elements, or to MISSING for ids
+            that are not in the document.
+
+    Methods:
+        register(element, id): Stores an element, optionally setting its id.
+        get(id): Returns the element with the id, or None.
+    """
+
+    def __init__(self, svg):
+        self.svg = svg
+        self.elements = {}
+
+    def register(self, element, id=None):
+        """Store an element under its id and return the element."""
+        if id is not None:
+            element.set("id", id)
+        self.elements[element.get("id")] = element
+        return element
+
+    def get(self, id):
+        """Return the element with the id, looking it up in the document once."""
+        element = self.elements.get(id)
+        if element is None:
+            element = self.svg.getElementById(id)
+            self.elements[id] = MISSING if element is None else element
+        return None if element is MISSING else element
+
+    def __getitem__(self, id):
+        element = self.get(id)
+        if element is None:
+            raise KeyError(id)
+        return element
+
+    def __contains__(self, id):
+        return self.get(id) is not None
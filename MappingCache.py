@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import tempfile
+
+
+class MappingCache:
+    """
+    A content-addressed on-disk cache of computed puzzle mappings.
+
+    Entries are JSON files named after the SHA-256 of their key, so the same
+    geometry and options always find the same entry. Reading an entry marks
+    it as recently used; once the cache grows beyond max_bytes the least
+    recently used entries are removed.
+
+    Args:
+        folder (str): The folder holding the cache entries.
+        max_bytes (int): The size the cache is trimmed to after a write.
+
+    Attributes:
+        folder (str): The folder holding the cache entries.
+        max_bytes (int): The size the cache is trimmed to after a write.
+
+    Methods:
+        key(*parts): Returns the key of JSON-serializable parts.
+        get(key): Returns the entry of a key, or None.
+        put(key, entry): Stores an entry and evicts the least recently used.
+    """
+
+    # Bumped whenever the layout of an entry or the computation changes
+    version = 2
+
+    def __init__(self, folder, max_bytes=64 * 1024 * 1024):
+        self.folder = folder
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def key(cls, *parts):
+        """Returns the hex digest of the parts and the cache version."""
+        data = json.dumps([cls.version, *parts], separators=(",", ":"))
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def path_of(self, key):
+        return os.path.join(self.folder, f"{key}.json")
+
+    def get(self, key):
+        """Returns the entry of a key, or None if it is missing or unreadable."""
+        path = self.path_of(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, entry):
+        """Stores an entry, replacing the file atomically, then trims the cache."""
+        os.makedirs(self.folder, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(temp_path, self.path_of(key))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits."""
+        entries = []
+        for name in os.listdir(self.folder):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
@@ -0,0 +1,152 @@
+from array import array
+
+from inkex import Vector2d
+from inkex.paths import Move, Path, move
+
+
+class PathSegments:
+    """
+    The nodes and deduplicated straight segments of paths, in document coordinates.
+
+    Every path is walked once over its end points with its composed transform
+    applied. Nodes are identified by their coordinates rounded to the given
+    number of digits and numbered in order of first appearance; a segment
+    joins two consecutive nodes of a subpath and is kept once, whichever
+    direction it is walked in. Coordinates and segments are held in flat
+    arrays, so large paths do not allocate an object per node or segment.
+
+    Args:
+        elements (iterable, optional): Path elements to add.
+        digits (int): The number of decimals nodes are rounded to.
+
+    Attributes:
+        x (array): The x-coordinate of every node, as first seen.
+        y (array): The y-coordinate of every node, as first seen.
+        keys (list): The rounded (x, y) coordinate of every node.
+        walk (array): The node of every end point of the paths, in path order.
+        starts (array): The index in walk where every subpath starts.
+        edge_a (array): The first node of every segment.
+        edge_b (array): The second node of every segment.
+
+    Methods:
+        add(element, parent): Adds a path element in document coordinates, or
+            in the user coordinates of a parent element.
+        add_path(path): Adds a path in document coordinates.
+        segments(): Yields the (x1, y1, x2, y2) of every segment.
+        line_segments(): Returns the segments as x1, y1, x2, y2 dicts.
+        adjacency(): Returns the segment graph in compressed sparse row form.
+        neighbors(node): Returns the nodes joined to a node by a segment.
+    """
+
+    def __init__(self, elements=(), digits=0):
+        self.digits = digits
+        self.x = array("d")
+        self.y = array("d")
+        self.keys = []
+        self.node_of = {}
+        self.walk = array("l")
+        self.starts = array("l")
+        self.edge_a = array("l")
+        self.edge_b = array("l")
+        self.edges = set()
+        self._adjacency = None
+        for element in elements:
+            self.add(element)
+
+    def __len__(self):
+        return len(self.edge_a)
+
+    @property
+    def node_count(self):
+        return len(self.keys)
+
+    def add(self, element, parent=None):
+        """Add a path element with its composed transform applied.
+
+        With a parent, the path is mapped into the user coordinates of the
+        parent instead, so elements created from the segments inside the
+        parent land on top of the path.
+        """
+        transform = element.composed_transform()
+        if parent is not None:
+            transform = -parent.composed_transform() @ transform
+        self.add_path(element.path.transform(transform))
+
+    def add_path(self, path):
+        """Add a path that is already in document coordinates."""
+        self._adjacency = None
+        digits = self.digits or None
+        node_of = self.node_of
+        walk = self.walk
+        edges = self.edges
+
+        first = prev = Vector2d()
+        previous_node = None
+        for command in Path(path):
+            end = command.end_point(first, prev)
+            key = (round(end.x, digits), round(end.y, digits))
+            node = node_of.get(key)
+            if node is None:
+                node = node_of[key] = len(self.keys)
+                self.keys.append(key)
+                self.x.append(end.x)
+                self.y.append(end.y)
+
+            if isinstance(command, (Move, move)) or previous_node is None:
+                self.starts.append(len(walk))
+                first = end
+            elif node != previous_node:
+                edge = (min(node, previous_node), max(node, previous_node))
+                if edge not in edges:
+                    edges.add(edge)
+                    self.edge_a.append(previous_node)
+                    self.edge_b.append(node)
+
+            walk.append(node)
+            previous_node = node
+            prev = end
+
+    def segments(self):
+        """Yield the (x1, y1, x2, y2) of every segment in path order."""
+        x, y = self.x, self.y
+        for a, b in zip(self.edge_a, self.edge_b):
+            yield x[a], y[a], x[b], y[b]
+
+    def line_segments(self):
+        """Return the segments as dicts with x1, y1, x2 and y2."""
+        return [
+            {"x1": x1, "y1": y1, "x2": x2, "y2": y2}
+            for x1, y1, x2, y2 in self.segments()
+        ]
+
+    def adjacency(self):
+        """
+        Return the segment graph in compressed sparse row form.
+
+        Returns:
+            tuple: offsets and neighbors arrays, where the neighbors of node n
+            are neighbors[offsets[n]:offsets[n + 1]].
+        """
+        if self._adjacency is None:
+            nodes = self.node_count
+            offsets = array("l", [0]) * (nodes + 1)
+            for a, b in zip(self.edge_a, self.edge_b):
+                offsets[a + 1] += 1
+                offsets[b + 1] += 1
+            for node in range(nodes):
+                offsets[node + 1] += offsets[node]
+
+            fill = array("l", offsets[:-1])
+            neighbors = array("l", [0]) * offsets[nodes]
+            for a, b in zip(self.edge_a, self.edge_b):
+                neighbors[fill[a]] = b
+                fill[a] += 1
+                neighbors[fill[b]] = a
+                fill[b] += 1
+            self._adjacency = (offsets, neighbors)
+        return self._adjacency
+
+    def neighbors(self, node):
+        """Return the nodes joined to a node by a segment."""
+        offsets, neighbors = self.adjacency()
+        return neighbors[offsets[node] : offsets[node + 1]]
@@ -0,0 +1,129 @@
+import inkex
+from inkex import Group, ShapeElement, TextElement, bezier
+from inkex.paths import Path
+
+from puzzle_core import PreparedPolygon
+
+
+class Plane:
+    """
+    A filled plane and its geometry in document coordinates.
+
+    The geometry is computed on first use, so transforms applied to the
+    element after it was indexed are taken into account.
+
+    Attributes:
+        element (ShapeElement): The filled element.
+        path (Path): The element's path with its composed transform applied.
+        polygon (PreparedPolygon): The flattened path, ready for containment tests.
+    """
+
+    # Maximal deviation of the flattened polygon from the curves of a plane
+    flatness = 0.5
+
+    def __init__(self, element):
+        self.element = element
+        self._path = None
+        self._polygon = None
+
+    @property
+    def path(self):
+        if self._path is None:
+            element = self.element
+            self._path = element.path.transform(element.composed_transform())
+        return self._path
+
+    @property
+    def polygon(self):
+        if self._polygon is None:
+            self._polygon = prepare_polygon(self.path, self.flatness)
+        return self._polygon
+
+
+def prepare_polygon(path, flatness=0.5):
+    """Flatten a path into a polygon prepared for containment tests."""
+    superpath = Path(path).to_superpath()
+    bezier.cspsubdiv(superpath, flatness)
+    return PreparedPolygon(
+        [[(node[1][0], node[1][1]) for node in subpath] for subpath in superpath]
+    )
+
+
+# Fills that do not paint a plain color of their own
+NO_FILL = ("none", "currentcolor", "inherit")
+
+
+def normalize_color(value):
+    """Returns a color as lowercase #rrggbb, or None if it is not a color.
+
+    The alpha of #rgba and #rrggbbaa colors is dropped, so only the RGB is
+    compared. None, currentColor, inherit and url(...) references are not
+    colors.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    lowered = value.lower()
+    if lowered in NO_FILL or lowered.startswith("url("):
+        return None
+    if lowered.startswith("#") and len(lowered) in (5, 9):
+        value = value[:4] if len(lowered) == 5 else value[:7]  # Drop the alpha
+    try:
+        color = inkex.Color(value)
+    except (inkex.colors.ColorError, ValueError, TypeError):
+        return None
+    if not list(color):
+        return None  # An empty named color
+    return "#{:02x}{:02x}{:02x}".format(*list(color.to_rgb())[:3])
+
+
+class PlaneIndex:
+    """
+    The planes of a document filled with a given color, found in one traversal.
+
+    Fills are read from the parsed style attribute, falling back to the fill
+    presentation attribute, and compared as RGB colors. So "fill: #808080",
+    "fill:#808080" and "fill:#808080FF" all match the same plane fill, while
+    unfilled shapes never match, whatever the plane fill.
+
+    Args:
+        svg (SvgDocumentElement): The document to index.
+        fill (str): The fill color of the planes.
+
+    Attributes:
+        fill (str): The normalized fill color.
+        planes (list): The Plane of every matching shape, in document order.
+
+    Methods:
+        elements(): Returns the matching shape elements.
+    """
+
+    def __init__(self, svg, fill):
+        self.fill = normalize_color(fill)
+        self.planes = []
+        for element in svg.iter():
+            if not isinstance(element, ShapeElement) or isinstance(
+                element, (Group, TextElement)
+            ):
+                continue
+            if self.fill_of(element) == self.fill:
+                self.planes.append(Plane(element))
+
+    @staticmethod
+    def fill_of(element):
+        style = element.get("style")
+        value = None
+        if style and "fill" in style:
+            value = inkex.Style(style).get("fill")
+        if value is None:
+            value = element.get("fill")
+        return normalize_color(value) if value else None
+
+    def elements(self):
+        return [plane.element for plane in self.planes]
+
+    def __iter__(self):
+        return iter(self.planes)
+
+    def __len__(self):
+        return len(self.planes)
@@ -0,0 +1,205 @@
+import json
+import mmap
+import os
+import struct
+
+
+class PuzzleExporter:
+    """
+    Streams the data of a puzzle to a file, one record at a time.
+
+    Two formats are supported:
+
+    - "ndjson": one compact JSON object per line, each with a "type" of
+      "meta", "dot", "connection", "collision" or "segment".
+    - "binary": a small header followed by sections of fixed-size little-endian
+      records, so a section can be memory-mapped and read with
+      struct.iter_unpack. Dots are numbered by their row in the dot table,
+      which is the order of their labels, and connections and collisions
+      refer to dots by that number.
+
+    Records are buffered and written in chunks, so the complete puzzle is
+    never held in memory as one document.
+
+    Args:
+        folder (str): The folder to write to, usually the folder of the SVG.
+        name (str): The file name without extension.
+        format (str): "ndjson" or "binary".
+
+    Attributes:
+        path (str): The path of the exported file.
+        format (str): The export format.
+
+    Methods:
+        write_meta(meta): Writes a dict of puzzle-wide values.
+        write_dots(dots): Writes the unique dots of a DotTable.
+        write_connections(dots): Writes the dots of the path in path order.
+        write_collisions(dots, pairs): Writes the colliding (dot, dot, distance) pairs.
+        write_line_segments(segments): Writes (x1, y1, x2, y2) line segments.
+        close(): Finishes the file.
+    """
+
+    formats = ("ndjson", "binary")
+    extensions = {"ndjson": "ndjson", "binary": "dotc"}
+
+    magic = b"DOTC"
+    version = 1
+    header = struct.Struct("<4sH")
+    # Tag, size of one record in bytes, number of records
+    section_header = struct.Struct("<4sIQ")
+    records = {
+        b"META": struct.Struct("<B"),  # UTF-8 JSON, one byte per record
+        b"DOTS": struct.Struct("<iiB"),  # x, y, has_collision
+        b"CONN": struct.Struct("<I"),  # dot number
+        b"COLL": struct.Struct("<IIf"),  # dot number, dot number, distance
+        b"SEGM": struct.Struct("<dddd"),  # x1, y1, x2, y2
+    }
+
+    # Records buffered before they are written to the file
+    chunk_size = 4096
+
+    def __init__(self, folder, name, format="ndjson"):
+        if format not in self.formats:
+            raise ValueError(
+                f"Invalid export format {format!r}. Should be one of {self.formats}."
+            )
+        self.format = format
+        self.path = os.path.join(folder, f"{name}.{self.extensions[format]}")
+        if format == "binary":
+            self.file = open(self.path, "wb")
+            self.file.write(self.header.pack(self.magic, self.version))
+        else:
+            self.file = open(self.path, "w", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def write_meta(self, meta: dict):
+        """Writes a dict of puzzle-wide values, such as the stats."""
+        if self.format == "binary":
+            data = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+            self.file.write(self.section_header.pack(b"META", 1, len(data)))
+            self.file.write(data)
+        else:
+            self.write_lines([dict(type="meta", **meta)])
+
+    def write_dots(self, dots):
+        """Writes the coordinates, labels and collisions of a DotTable."""
+        rows = zip(dots.x, dots.y, dots.has_collision)
+        if self.format == "binary":
+            records = ((x, y, bool(has_collision)) for x, y, has_collision in rows)
+        else:
+            records = (
+                {
+                    "type": "dot",
+                    "x": x,
+                    "y": y,
+                    "label": dots.label(dot),
+                    "has_collision": bool(has_collision),
+                }
+                for dot, (x, y, has_collision) in enumerate(rows)
+            )
+        self.write_section(b"DOTS", records)
+
+    def write_connections(self, dots):
+        """Writes the dot of every step of the path, in path order."""
+        if self.format == "binary":
+            records = ((dot,) for dot in dots.step_dot)
+        else:
+            records = (
+                {"type": "connection", "step": number, "label": label}
+                for number, label in zip(dots.step_number, dots.step_labels())
+            )
+        self.write_section(b"CONN", records)
+
+    def write_collisions(self, dots, pairs):
+        """Writes (dot, dot, distance) pairs of dots that are too close."""
+        if self.format == "binary":
+            records = pairs
+        else:
+            records = (
+                {
+                    "type": "collision",
+                    "a": dots.label(a),
+                    "b": dots.label(b),
+                    "distance": distance,
+                }
+                for a, b, distance in pairs
+            )
+        self.write_section(b"COLL", records)
+
+    def write_line_segments(self, segments):
+        """Writes line segment dicts with "x1", "y1", "x2" and "y2"."""
+        if self.format == "binary":
+            records = ((s["x1"], s["y1"], s["x2"], s["y2"]) for s in segments)
+        else:
+            records = (dict(type="segment", **segment) for segment in segments)
+        self.write_section(b"SEGM", records)
+
+    def write_section(self, tag, records):
+        if self.format != "binary":
+            self.write_lines(records)
+            return
+
+        record = self.records[tag]
+        start = self.file.tell()
+        # The number of records is patched in once the section is written
+        self.file.write(self.section_header.pack(tag, record.size, 0))
+        count = 0
+        buffer = bytearray()
+        for values in records:
+            buffer += record.pack(*values)
+            count += 1
+            if count % self.chunk_size == 0:
+                self.file.write(buffer)
+                buffer.clear()
+        self.file.write(buffer)
+
+        end = self.file.tell()
+        self.file.seek(start)
+        self.file.write(self.section_header.pack(tag, record.size, count))
+        self.file.seek(end)
+
+    def write_lines(self, records):
+        lines = []
+        for record in records:
+            lines.append(json.dumps(record, separators=(",", ":")))
+            if len(lines) == self.chunk_size:
+                self.file.write("\n".join(lines) + "\n")
+                lines.clear()
+        if lines:
+            self.file.write("\n".join(lines) + "\n")
+
+
+def read_sections(path):
+    """
+    Yields the (tag, records) of every section of a binary export.
+
+    The file is memory-mapped and the records of a section are the tuples of
+    struct.iter_unpack over a view of the mapping, so only the pages that are
+    iterated are read. The mapping is released once no records refer to it.
+    """
+    with open(path, "rb") as f:
+        data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    magic, version = PuzzleExporter.header.unpack_from(data)
+    if magic != PuzzleExporter.magic:
+        raise ValueError(f"{path} is not a puzzle export.")
+    if version != PuzzleExporter.version:
+        raise ValueError(f"Unsupported puzzle export version {version}.")
+
+    offset = PuzzleExporter.header.size
+    while offset < len(data):
+        tag, size, count = PuzzleExporter.section_header.unpack_from(data, offset)
+        offset += PuzzleExporter.section_header.size
+        body = data[offset : offset + size * count]
+        offset += size * count
+        if tag == b"META":
+            yield tag, json.loads(bytes(body))
+        else:
+            yield tag, PuzzleExporter.records[tag].iter_unpack(body)
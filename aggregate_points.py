@@ -4,7 +4,7 @@ from inkex.elements import PathElement
 from inkex.localization import inkex_gettext as _
 from inkex.paths import Path
 
-from PointsAggregator import PointsAggregator
+from puzzle_core import PointsAggregator
 
 
 class AggregatePointsExtension(inkex.EffectExtension):
@@ -18,6 +18,28 @@ class AggregatePointsExtension(inkex.EffectExtension):
             help="The radius of the neighborhood to aggregate points (default: 5)",
         )
 
+        pars.add_argument(
+            "--mode",
+            type=str,
+            default="average",
+            choices=["average", "cluster"],
+            help="Average each point with its neighbors, or collapse clusters of neighbors into one point (default: average)",
+        )
+
+        pars.add_argument(
+            "--max_iterations",
+            type=int,
+            default=1,
+            help="Repeat the aggregation until a pass merges nothing, at most this many times (default: 1)",
+        )
+
+        pars.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.0,
+            help="Stop repeating once no point moves further than this distance (default: 0.0)",
+        )
+
         pars.add_argument("--tab", help="The selected UI-tab when OK was pressed")
 
     def effect(self):
@@ -33,13 +55,26 @@ class AggregatePointsExtension(inkex.EffectExtension):
             raise AbortExtension(_("Please select at least one path object."))
 
         for target_paths in target_paths:
-            self.aggregate_points(target_paths, options.aggregation_radius)
+            self.aggregate_points(
+                target_paths,
+                options.aggregation_radius,
+                options.mode,
+                options.max_iterations,
+                options.tolerance,
+            )
             # move the original path to the left
             target_paths.transform = "translate(-20,0)"
             target_paths.set("id", "original_path")
             target_paths.set("style", "stroke:#D3D3D3;fill:none;stroke-width:1pt")
 
-    def aggregate_points(self, element: PathElement, aggregation_radius=5):
+    def aggregate_points(
+        self,
+        element: PathElement,
+        aggregation_radius=5,
+        mode="average",
+        max_iterations=1,
+        tolerance=0.0,
+    ):
         """Find the neighbors of the points in the path element and aggregate them"""
         path: Path = element.path.transform(element.composed_transform())
         points = path.to_absolute().control_points
@@ -49,7 +84,26 @@ class AggregatePointsExtension(inkex.EffectExtension):
             coords.append((x, y))
 
         nf = PointsAggregator(coords, aggregation_radius)
-        averaged_points, neighbords_merged = nf.evaluate_points()
+        if max_iterations > 1:
+            averaged_points, passes = nf.converge(mode, max_iterations, tolerance)
+            neighbords_merged = any(merged for merged, _, _ in passes)
+            for number, (merged, displacement, points_left) in enumerate(passes, 1):
+                inkex.utils.debug(
+                    f"Pass {number}: {merged} points merged, largest displacement {round(displacement, 3)}, {points_left} points left"
+                )
+        elif mode == "cluster":
+            averaged_points, merged = nf.cluster_points()
+            # Points are averaged with their cluster even when none is dropped
+            neighbords_merged = nf.stats["clusters"] < nf.stats["original_points"]
+            inkex.utils.debug(
+                f"Original number of points: {nf.stats['original_points']}, New number of points: {nf.stats['new_points']}, Clusters: {nf.stats['clusters']}, Points merged: {merged}"
+            )
+        else:
+            averaged_points, neighbords_merged = nf.evaluate_points()
+            # Original number of points to the new number of points
+            inkex.utils.debug(
+                f"Original number of points: {nf.stats['original_points']}, New number of points: {nf.stats['new_points']}, Neighbors merged: {nf.stats['neighbors_merged']}, Duplicates merged: {nf.stats['duplicates_merged']}"
+            )
 
         # # create new path with averaged points
         new_path = PathElement()
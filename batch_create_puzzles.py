@@ -0,0 +1,146 @@
+# Create puzzles for many source drawings without Inkscape
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from create_puzzle import CreatePuzzle
+
+
+def collect_sources(patterns):
+    """Expand directories and glob patterns into a sorted list of SVG files"""
+    sources = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.svg")
+        sources.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(sources)
+
+
+def load_options(options_file):
+    """Turn a JSON object of extension options into command-line arguments"""
+    if not options_file:
+        return []
+    with open(options_file) as f:
+        options = json.load(f)
+
+    args = []
+    for name, value in options.items():
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        args.append(f"--{name}={value}")
+    return args
+
+
+def output_paths(sources, output_dir):
+    """Mirror the paths of the sources below their common directory in output_dir"""
+    sources = [os.path.abspath(source) for source in sources]
+    if not sources:
+        return []
+    base = os.path.commonpath([os.path.dirname(source) for source in sources])
+    return [
+        os.path.join(output_dir, os.path.relpath(source, base)) for source in sources
+    ]
+
+
+def create_puzzle(source, output, args):
+    """Run the full CreatePuzzle effect on a single source file"""
+    # Worker processes are reused, so point the extension at this document
+    os.environ["DOCUMENT_PATH"] = os.path.abspath(source)
+    started = time.perf_counter()
+    result = {"source": source, "output": output}
+    try:
+        CreatePuzzle().run([*args, f"--output={output}", source])
+        result["status"] = "ok"
+    except SystemExit as err:
+        # AbortExtension is reported on stderr and ends in sys.exit
+        result["status"] = "aborted"
+        result["error"] = f"exit status {err.code}"
+    except Exception as err:
+        result["status"] = "failed"
+        result["error"] = f"{type(err).__name__}: {err}"
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def run_batch(sources, output_dir, args, workers=None):
+    """Create the puzzles in a process pool and return one result per source"""
+    # Sources with the same name in different directories keep apart
+    outputs = output_paths(sources, output_dir)
+    for output in outputs:
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(create_puzzle, source, output, args)
+            for source, output in zip(sources, outputs)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"{result['status']:>7} {result['seconds']:8.2f}s {result['source']}")
+            results.append(result)
+
+    return sorted(results, key=lambda result: result["source"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Create dot-to-dot puzzles for many SVG files in parallel."
+    )
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        help="Source SVG files, directories or glob patterns",
+    )
+    parser.add_argument(
+        "--options",
+        help="JSON file with the create_puzzle options shared by all files",
+    )
+    parser.add_argument(
+        "--output_dir",
+        default="puzzles",
+        help="Directory to write the puzzles to (default: puzzles)",
+    )
+    parser.add_argument(
+        "--report",
+        help="Path of the JSON summary (default: batch_report.json in output_dir)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    so = parser.parse_args(argv)
+
+    sources = collect_sources(so.sources)
+    if not sources:
+        parser.error("No SVG files found.")
+    output_dir = os.path.abspath(so.output_dir)
+    if any(os.path.dirname(os.path.abspath(src)) == output_dir for src in sources):
+        parser.error("The output directory must not contain the source files.")
+
+    started = time.perf_counter()
+    results = run_batch(sources, so.output_dir, load_options(so.options), so.workers)
+    summary = {
+        "total": len(results),
+        "ok": sum(result["status"] == "ok" for result in results),
+        "seconds": round(time.perf_counter() - started, 3),
+        "results": results,
+    }
+
+    report = so.report or os.path.join(so.output_dir, "batch_report.json")
+    with open(report, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    print(
+        f"{summary['ok']} of {summary['total']} puzzles created in {summary['seconds']}s"
+    )
+    return 0 if summary["ok"] == summary["total"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+# Time the puzzle pipeline on synthetic drawings without Inkscape
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from inkex import Group, PathElement
+
+from break_up_lines import BreakUpLinesExtension
+from CentroidPlotter import CentroidPlotter
+from create_puzzle import CreatePuzzle
+from document_setup import setup
+from ElementRegistry import ElementRegistry
+from puzzle_core import PointsAggregator
+
+PAGE_WIDTH, PAGE_HEIGHT = 794, 1123
+PLANE_FILL = "#808080"
+
+
+def random_walk(n, rng):
+    """A walk of n steps in random directions, kept on the page"""
+    x, y, points = PAGE_WIDTH / 2, PAGE_HEIGHT / 2, []
+    for _ in range(n):
+        angle = rng.uniform(0, 2 * math.pi)
+        step = rng.uniform(4, 12)
+        x = min(max(x + step * math.cos(angle), 0), PAGE_WIDTH)
+        y = min(max(y + step * math.sin(angle), 0), PAGE_HEIGHT)
+        points.append((x, y))
+    return points
+
+
+def spiral(n, rng):
+    """An Archimedean spiral with n points about 6 units apart"""
+    points, angle = [], 0.0
+    for _ in range(n):
+        radius = 10 + 2 * angle
+        points.append(
+            (
+                PAGE_WIDTH / 2 + radius * math.cos(angle) + rng.random(),
+                PAGE_HEIGHT / 2 + radius * math.sin(angle) + rng.random(),
+            )
+        )
+        angle += 6 / radius
+    return points
+
+
+def near_duplicates(n, rng):
+    """A dense polyline that revisits its points with sub-unit jitter"""
+    base = random_walk(max(n // 3, 2), rng)
+    points = []
+    while len(points) < n:
+        start = rng.randrange(len(base))
+        for x, y in base[start : start + rng.randint(5, 40)]:
+            points.append((x + rng.uniform(-0.6, 0.6), y + rng.uniform(-0.6, 0.6)))
+    return points[:n]
+
+
+def concave_planes(n, rng):
+    """A random walk over a map with many concave filled planes"""
+    return random_walk(n, rng)
+
+
+GENERATORS = {
+    "random_walk": random_walk,
+    "spiral": spiral,
+    "near_duplicates": near_duplicates,
+    "concave_planes": concave_planes,
+}
+
+
+def concave_plane(cx, cy, size, rng):
+    """A star-shaped plane with alternating inner and outer vertices"""
+    spikes = rng.randint(5, 9)
+    nodes = []
+    for i in range(spikes * 2):
+        radius = size if i % 2 == 0 else size * rng.uniform(0.3, 0.5)
+        angle = math.pi * i / spikes
+        nodes.append(
+            f"{cx + radius * math.cos(angle):.2f},{cy + radius * math.sin(angle):.2f}"
+        )
+    return "M " + " L ".join(nodes) + " Z"
+
+
+def make_svg(generator, n, seed=1):
+    """Return the source SVG of a synthetic drawing with n path nodes"""
+    rng = random.Random(seed)
+    points = GENERATORS[generator](n, rng)
+    d = "M " + " L ".join(f"{x:.2f},{y:.2f}" for x, y in points)
+
+    number_of_planes = max(n // 50, 4) if generator == "concave_planes" else 4
+    planes = "".join(
+        f'<path style="fill:{PLANE_FILL};stroke:none" d="{concave_plane(rng.uniform(50, PAGE_WIDTH - 50), rng.uniform(50, PAGE_HEIGHT - 50), rng.uniform(10, 40), rng)}"/>'
+        for _ in range(number_of_planes)
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg"'
+        f' xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"'
+        f' xmlns:sodipodi="http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd"'
+        f' width="{PAGE_WIDTH}" height="{PAGE_HEIGHT}" viewBox="0 0 {PAGE_WIDTH} {PAGE_HEIGHT}"'
+        f' sodipodi:docname="{generator}_{n}.svg">'
+        f'<sodipodi:namedview id="namedview"/>'
+        f'<path id="source" style="fill:none;stroke:#000000" d="{d}"/>'
+        f"{planes}</svg>"
+    )
+
+
+def load_extension(extension_class, source, args=()):
+    """Parse the arguments and load the document, like run() does"""
+    os.environ["DOCUMENT_PATH"] = os.path.abspath(source)
+    extension = extension_class()
+    extension.parse_arguments([*args, source])
+    extension.load_raw()
+    return extension
+
+
+def prepare_puzzle(source):
+    """Load a CreatePuzzle run up to and including process_puzzle_path"""
+    extension = load_extension(CreatePuzzle, source)
+    extension.registry = ElementRegistry(extension.svg)
+    setup(extension, extension.options)
+    processed_path, _ = extension.process_puzzle_path(
+        extension.get_selected_elements(), extension.options.plane_fill
+    )
+    return extension, processed_path
+
+
+def bench_create_mapping(source):
+    extension, processed_path = prepare_puzzle(source)
+    return extension, lambda: extension.create_mapping(processed_path)
+
+
+def bench_check_density(source):
+    extension, processed_path = prepare_puzzle(source)
+    dots = extension.create_mapping(processed_path)
+    minimal_distance = extension.options.minimal_distance
+    return extension, lambda: extension.check_density(dots, minimal_distance)
+
+
+def bench_relax_collisions(source):
+    extension, processed_path = prepare_puzzle(source)
+    dots = extension.create_mapping(processed_path)
+    collision_pairs = extension.check_density(dots, extension.options.minimal_distance)
+    return extension, lambda: extension.relax_collisions(dots, collision_pairs)
+
+
+def bench_optimize_route(source):
+    extension, processed_path = prepare_puzzle(source)
+    dots = extension.create_mapping(processed_path)
+    return extension, lambda: extension.optimize_route(dots, "postman")
+
+
+def bench_evaluate_points(source):
+    extension = load_extension(CreatePuzzle, source)
+    path = extension.svg.getElementById("source").path.to_absolute()
+    points = [(x, y) for x, y in path.control_points]
+    return extension, lambda: PointsAggregator(points, 5).evaluate_points()
+
+
+def bench_plot_puzzle_centroids(source):
+    extension, _ = prepare_puzzle(source)
+    so = extension.options
+    plotter = CentroidPlotter(extension.svg, extension.registry)
+    return extension, lambda: plotter.plot_puzzle_centroids(
+        "centroids_layer",
+        "solution_layer",
+        so.clearance,
+        so.fraction,
+        so.plane_fill,
+        so.placement,
+        extension.plane_index,
+    )
+
+
+def bench_convert_path_to_lines(source):
+    extension = load_extension(BreakUpLinesExtension, source, ["--id=source"])
+    path = extension.svg.selection.filter(PathElement)[0]
+    group = extension.svg.add(Group())
+    return extension, lambda: extension.convert_path_to_lines(path, group, 1.0)
+
+
+def bench_effect(source):
+    extension = load_extension(CreatePuzzle, source)
+    return extension, extension.effect
+
+
+STAGES = {
+    "create_mapping": bench_create_mapping,
+    "check_density": bench_check_density,
+    "relax_collisions": bench_relax_collisions,
+    "optimize_route": bench_optimize_route,
+    "evaluate_points": bench_evaluate_points,
+    "plot_puzzle_centroids": bench_plot_puzzle_centroids,
+    "convert_path_to_lines": bench_convert_path_to_lines,
+    "effect": bench_effect,
+}
+
+
+def time_stage(stage, source, repeat):
+    """Return the fastest of repeat timings, each on a freshly loaded document"""
+    timings = []
+    for _ in range(repeat):
+        # Extensions report through stderr, which would drown the results
+        with contextlib.redirect_stderr(io.StringIO()):
+            extension, run = STAGES[stage](source)
+            try:
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+            finally:
+                extension.clean_up()
+    return min(timings)
+
+
+def run_benchmarks(generators, sizes, stages, repeat, folder):
+    results = []
+    for generator in generators:
+        for size in sizes:
+            source = os.path.join(folder, f"{generator}_{size}.svg")
+            with open(source, "w") as f:
+                f.write(make_svg(generator, size))
+            for stage in stages:
+                seconds = time_stage(stage, source, repeat)
+                print(f"{generator:>16} {size:>6} {stage:>22} {seconds:9.4f}s")
+                results.append(
+                    {
+                        "generator": generator,
+                        "dots": size,
+                        "stage": stage,
+                        "seconds": round(seconds, 6),
+                    }
+                )
+    return results
+
+
+def compare(results, baseline_file):
+    """Print the ratio of every timing to the same timing in a baseline"""
+    with open(baseline_file) as f:
+        baseline = {
+            (r["generator"], r["dots"], r["stage"]): r["seconds"]
+            for r in json.load(f)["results"]
+        }
+    for r in results:
+        before = baseline.get((r["generator"], r["dots"], r["stage"]))
+        if before:
+            print(
+                f"{r['generator']:>16} {r['dots']:>6} {r['stage']:>22} {r['seconds'] / before:8.2f}x"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time the puzzle pipeline on synthetic drawings."
+    )
+    parser.add_argument(
+        "--generators",
+        nargs="+",
+        default=list(GENERATORS),
+        choices=list(GENERATORS),
+        help="Synthetic drawings to generate (default: all)",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=[100, 1000, 10000],
+        help="Number of path nodes per drawing (default: 100 1000 10000)",
+    )
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        default=list(STAGES),
+        choices=list(STAGES),
+        help="Stages to time (default: all)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per stage, the fastest is reported (default: 3)",
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark_results.json",
+        help="Path of the JSON results (default: benchmark_results.json)",
+    )
+    parser.add_argument(
+        "--compare",
+        help="Earlier JSON results to print the relative timings against",
+    )
+    parser.add_argument(
+        "--keep_svgs",
+        help="Directory to keep the generated drawings in (default: a temporary one)",
+    )
+    so = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        if so.keep_svgs:
+            folder = so.keep_svgs
+            os.makedirs(folder, exist_ok=True)
+        results = run_benchmarks(so.generators, so.sizes, so.stages, so.repeat, folder)
+
+    with open(so.output, "w") as f:
+        json.dump(
+            {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "repeat": so.repeat,
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+    if so.compare:
+        compare(results, so.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
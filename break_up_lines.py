@@ -1,8 +1,11 @@
 import inkex
 from inkex import AbortExtension
 from inkex.elements import PathElement, Line, Group
-from inkex import Vector2d
-import json
+import os
+
+from CompoundPath import CompoundPath
+from PathSegments import PathSegments
+from PuzzleExporter import PuzzleExporter
 
 class BreakUpLinesExtension(inkex.EffectExtension):
     """Break up a path into line segments and add caps at the start and end."""
@@ -10,7 +13,10 @@ class BreakUpLinesExtension(inkex.EffectExtension):
     def add_arguments(self, pars):
         """Add custom arguments to the parser."""
         pars.add_argument("--line_width", type=float, default=1.0, help="Width of the line")
-        pars.add_argument("--save_json", type=inkex.Boolean, default=False, help="Save line segments to JSON")
+        pars.add_argument("--save_json", type=inkex.Boolean, default=False, help="Save line segments next to the SVG")
+        pars.add_argument("--export_format", type=str, default="ndjson", choices=["ndjson", "binary"], help="Format of the saved line segments")
+        pars.add_argument("--output_mode", type=str, default="lines", choices=["lines", "compound"], help="One line element per segment, or all segments in compound paths")
+        pars.add_argument("--keep_ids", type=inkex.Boolean, default=False, help="Record the segment index of every subpath of a compound path")
 
         pars.add_argument("--tab", help="The selected UI-tab when OK was pressed")
 
@@ -32,71 +38,43 @@ class BreakUpLinesExtension(inkex.EffectExtension):
             raise AbortExtension("Please select at least one path object.")
 
         # Process the selected path into lines and apply caps
-        line_segments = self.convert_path_to_lines(target_paths[0], lines_group, line_width)
+        line_segments = self.convert_path_to_lines(
+            target_paths[0], lines_group, line_width, self.options.output_mode, self.options.keep_ids
+        )
         if save_json:
-            self.save_line_segments(line_segments)
+            self.save_line_segments(line_segments, self.options.export_format)
 
 
-    def convert_path_to_lines(self, path: PathElement, lines_group: Group,line_widht:float) -> list:
+    def convert_path_to_lines(self, path: PathElement, lines_group: Group, line_widht: float, output_mode="lines", keep_ids=False) -> list:
         """Convert a path element into line segments and store in a group."""
-        graph = {}  # Encapsulated within this method
-        line_segments = []
-        unique_segments = set()  # Store undirected unique edges
-
-        # Extract segments from path and break apart shorthand notation
-        segments = path.path.to_non_shorthand().break_apart()
-
-        for coordinates in segments:
-            if len(coordinates) < 2:
-                continue
-
-            start = Vector2d(coordinates[0].x, coordinates[0].y)
-            for i in range(1, len(coordinates)):
-                end = Vector2d(coordinates[i].x, coordinates[i].y)
-
-                # Create undirected edge as frozenset of rounded coordinates
-                edge = frozenset([
-                    (round(start.x), round(start.y)),
-                    (round(end.x), round(end.y))
-                ])
-
-                # Skip duplicates
-                if edge in unique_segments:
-                    start = end
-                    continue
-                unique_segments.add(edge)
-
-                # Build the graph representation
-                graph.setdefault(start, []).append(end)
-                graph.setdefault(end, []).append(start)
-
-
-                # Create the line element
-                current_id = len(line_segments) + 1
-                line = Line.new(start, end, id=f"line_{current_id}", style=f"stroke:#000000;fill:none;stroke-width:{line_widht}")
-                lines_group.add(line)
-                line_segments.append({
-                    "x1": start.x,
-                    "y1": start.y,
-                    "x2": end.x,
-                    "y2": end.y
-                })
-
-                # Move start point to current end for next line
-                start = end
-
-
-        return line_segments
-
-    
-
-    def save_line_segments(self, line_segments: list):
-        """Save line segments to a JSON file."""
+        # The lines are placed in the coordinates of the group they are added to
+        segments = PathSegments()
+        segments.add(path, lines_group)
+        style = f"stroke:#000000;fill:none;stroke-width:{line_widht}"
+
+        if output_mode == "compound":
+            # All segments as subpaths of a few path elements
+            compound = CompoundPath(keep_ids)
+            for x1, y1, x2, y2 in segments.segments():
+                compound.add(x1, y1, x2, y2)
+            for element in compound.elements("lines", style):
+                lines_group.add(element)
+            return segments.line_segments()
+
+        for current_id, (x1, y1, x2, y2) in enumerate(segments.segments(), 1):
+            # Create the line element
+            line = Line.new((x1, y1), (x2, y2), id=f"line_{current_id}", style=style)
+            lines_group.add(line)
+
+        return segments.line_segments()
+
+    def save_line_segments(self, line_segments: list, export_format="ndjson"):
+        """Stream line segments to a file next to the SVG."""
         try:
-            with open("line_segments.json", "w") as f:
-                json.dump(line_segments, f, indent=4)
+            with PuzzleExporter(self.svg_path(os.getcwd()), "line_segments", export_format) as exporter:
+                exporter.write_line_segments(line_segments)
         except IOError as e:
-            inkex.utils.debug(f"Failed to save line_segments.json: {e}")
+            inkex.utils.debug(f"Failed to save line segments: {e}")
 
 if __name__ == "__main__":
     BreakUpLinesExtension().run()
@@ -5,6 +5,9 @@ from inkex import Vector2d
 import json
 import math
 
+from CompoundPath import CompoundPath
+from PathSegments import PathSegments
+
 class ConnectThatDotExtension(inkex.EffectExtension):
     """Break up a path into line segments and add caps at the start and end."""
 
@@ -25,6 +28,8 @@ class ConnectThatDotExtension(inkex.EffectExtension):
         )
 
         pars.add_argument("--stroke_width", type=float, default=1.0, help="Width of the line")
+        pars.add_argument("--output_mode", type=str, default="lines", choices=["lines", "compound"], help="Two line elements per segment, or all caps in compound paths")
+        pars.add_argument("--keep_ids", type=inkex.Boolean, default=False, help="Record the segment index of every cap of a compound path")
         
 
         pars.add_argument("--tab", help="The selected UI-tab when OK was pressed")
@@ -45,71 +50,37 @@ class ConnectThatDotExtension(inkex.EffectExtension):
 
         # Process the selected paths into lines and apply caps
         for path in target_paths:
-            line_segments = self.convert_path_to_lines(path)
-            self.cap_line_segments(line_segments, line_length, cap_style, stroke_width)
-
-
-    def convert_path_to_lines(self, path: PathElement) -> list:
-        """Convert a path element into line segments and store in a group."""
-        graph = {}  # Encapsulated within this method
-        line_segments = []
-        unique_segments = set()  # Store undirected unique edges
-
-        # Extract segments from path and break apart shorthand notation
-        segments = path.path.to_non_shorthand().break_apart()
-
-        for coordinates in segments:
-            if len(coordinates) < 2:
-                continue
-
-            start = Vector2d(coordinates[0].x, coordinates[0].y)
-            for i in range(1, len(coordinates)):
-                end = Vector2d(coordinates[i].x, coordinates[i].y)
-
-                # Create undirected edge as frozenset of rounded coordinates
-                edge = frozenset([
-                    (round(start.x), round(start.y)),
-                    (round(end.x), round(end.y))
-                ])
-
-                # Skip duplicates
-                if edge in unique_segments:
-                    start = end
-                    continue
-                unique_segments.add(edge)
-
-                # Build the graph representation
-                graph.setdefault(start, []).append(end)
-                graph.setdefault(end, []).append(start)
-
-
-                # Create a line element and add to the group
-                line_segments.append({
-                    "x1": start.x,
-                    "y1": start.y,
-                    "x2": end.x,
-                    "y2": end.y
-                })
-
-                # Move start point to current end for next line
-                start = end
-
-
-        return line_segments
-
-    def cap_line_segments(self, line_segments: list, line_length: int, cap_style: str, stroke_width: float):
-        """Plot line caps at start and end of each segment."""
-        cap_group = self.svg.get_current_layer().add(
+            cap_group = self.add_cap_group(stroke_width, cap_style)
+            segments = self.convert_path_to_lines(path, cap_group)
+            self.cap_line_segments(
+                segments, line_length, cap_style, stroke_width,
+                self.options.output_mode, self.options.keep_ids, cap_group
+            )
+
+
+    def convert_path_to_lines(self, path: PathElement, parent=None) -> PathSegments:
+        """Convert a path element into its deduplicated line segments.
+
+        The segments are in the coordinates of the parent the caps are added
+        to, or in document coordinates without a parent.
+        """
+        segments = PathSegments()
+        segments.add(path, parent)
+        return segments
+
+    def add_cap_group(self, stroke_width: float, cap_style: str) -> Group:
+        """Add the group holding the caps to the current layer."""
+        return self.svg.get_current_layer().add(
            Group(id="cap_group", style=f"stroke:#0000FF;fill:none;stroke-width:{stroke_width}, stroke-linecap:{cap_style}")
         )
 
-        for point in line_segments:
-            try:
-                x1, y1 = float(point['x1']), float(point['y1'])
-                x2, y2 = float(point['x2']), float(point['y2'])
-            except (KeyError, ValueError, TypeError):
-                continue  # Skip invalid segments
+    def cap_line_segments(self, segments: PathSegments, line_length: int, cap_style: str, stroke_width: float, output_mode="lines", keep_ids=False, cap_group=None):
+        """Plot line caps at start and end of each segment."""
+        if cap_group is None:
+            cap_group = self.add_cap_group(stroke_width, cap_style)
+        compound = CompoundPath(keep_ids) if output_mode == "compound" else None
 
+        for index, (x1, y1, x2, y2) in enumerate(segments.segments()):
             length = math.hypot(x2 - x1, y2 - y1)
             if length == 0:
                 continue
@@ -118,6 +89,12 @@ class ConnectThatDotExtension(inkex.EffectExtension):
             effective_line_length = min(line_length, length / 2)
             dx, dy = (x2 - x1) / length, (y2 - y1) / length
 
+            if compound is not None:
+                # Both caps as subpaths of the compound path
+                compound.add(x1, y1, x1 + effective_line_length * dx, y1 + effective_line_length * dy, index)
+                compound.add(x2, y2, x2 - effective_line_length * dx, y2 - effective_line_length * dy, index)
+                continue
+
             # Start cap line
             start_end = Vector2d(x1 + effective_line_length * dx, y1 + effective_line_length * dy)
             start_line = Line.new(Vector2d(x1, y1), start_end)
@@ -128,6 +105,10 @@ class ConnectThatDotExtension(inkex.EffectExtension):
             end_line = Line.new(Vector2d(x2, y2), end_start)
             cap_group.add(end_line)
 
+        if compound is not None:
+            for element in compound.elements("caps"):
+                cap_group.add(element)
+
     
 
 
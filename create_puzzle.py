@@ -1,6 +1,7 @@
 # Import required modules
-import json
+import logging
 import math
+import os
 import random
 
 import inkex
@@ -16,15 +17,30 @@ from inkex import (
     PathElement,
     Rectangle,
     Style,
+    StyleElement,
+    Symbol,
     TextElement,
     Tspan,
+    Use,
 )
 from inkex.localization import inkex_gettext
 from inkex.paths import Path
 
 from CentroidPlotter import CentroidPlotter
 from document_setup import setup
+from ElementRegistry import ElementRegistry
 from extension_args import add_arguments
+from MappingCache import MappingCache
+from PathSegments import PathSegments
+from PlaneIndex import PlaneIndex
+from puzzle_core import DotStatistics, DotTable, LabelCodec, SequenceLayout
+from puzzle_core import mapping as core_mapping
+from puzzle_core import relaxation
+from puzzle_core import route as core_route
+from PuzzleExporter import PuzzleExporter
+from StageProfiler import StageProfiler
+
+logger = logging.getLogger(__name__)
 
 
 # Create a class named NumberDots that inherits from inkex.EffectExtension
@@ -34,6 +50,10 @@ class CreatePuzzle(EffectExtension):
     coding_sequence = (
         "abcdefghijklmnopqrstuvwxyz" + "1234567890" + "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
     )
+    # Labels start at two characters and grow once those run out
+    label_width = 2
+    # Remaining collisions reported by name after relaxation
+    residual_pairs_shown = 5
     fontConsolas = Style(
         {
             "font-family": "Consolas",
@@ -49,6 +69,13 @@ class CreatePuzzle(EffectExtension):
         }
     )
 
+    @property
+    def label_codec(self):
+        """The shared codec of the coding sequence and label width"""
+        return LabelCodec.for_alphabet(
+            self.coding_sequence, self.label_width, variable_width=True
+        )
+
     # Define method to add command-line arguments for the extension
     def add_arguments(self, pars):
         add_arguments(pars)
@@ -59,89 +86,155 @@ class CreatePuzzle(EffectExtension):
         self.fontConsolas["font-weight"] = so.fontweight
         self.fontConsolas["font-size"] = so.fontsize
 
-        layers, pages, guides, paper = setup(self, so)
+        self.registry = ElementRegistry(self.svg)
+        profiler = StageProfiler(self.svg, so.profile_report != "none", so.profile_dump)
+
+        with profiler.stage("setup"):
+            layers, pages, guides, paper = setup(self, so)
         self.layers = layers
         self.pages = pages
         self.guides = guides
         self.paper = paper
 
-        source_path = self.get_selected_elements()
-        processed_path, processed_planes = self.process_puzzle_path(
-            source_path, so.plane_fill
-        )
+        with profiler.stage("process_puzzle_path"):
+            source_path = self.get_selected_elements()
+            processed_path, processed_planes = self.process_puzzle_path(
+                source_path, so.plane_fill
+            )
 
-        # Create a mapping of letter IDs, numbers, and coordinates
-        # Also check for collisions and calculate distances
-        dot_connections = self.create_mapping(processed_path)
-        collisions, sorted_dots, all_distances = self.check_density(
-            dot_connections, so.minimal_distance
-        )
+        # Reuse the mapping of an earlier run on the same geometry and options
+        cached = None
+        if so.use_cache:
+            with profiler.stage("mapping_cache"):
+                cache, cache_key = self.get_mapping_cache(processed_path)
+                cached = cache.get(cache_key)
+
+        if cached is not None:
+            dots, collision_pairs = self.restore_mapping(cached)
+        else:
+            # Create a mapping of letter IDs, numbers, and coordinates
+            # Also check for collisions and calculate distances
+            with profiler.stage("create_mapping"):
+                dots = self.create_mapping(processed_path)
+            if so.route != "path":
+                with profiler.stage("optimize_route"):
+                    self.optimize_route(dots, so.route)
+            with profiler.stage("check_density"):
+                collision_pairs = self.check_density(dots, so.minimal_distance)
+            if so.relax_collisions and collision_pairs:
+                with profiler.stage("relax_collisions"):
+                    collision_pairs = self.relax_collisions(dots, collision_pairs)
+        sorted_steps = dots.steps_by_distance()
         avg_distance, lowest_distance, highest_distance = self.evaluate_distances(
-            sorted_dots
+            dots, sorted_steps
         )
         planes = self.count_planes("centroids_layer", so.plane_fill)
 
         # Plot the Puzzle Dots and Centroids
         if so.plot_dots:
-            self.plot_puzzle_dots(
-                dot_connections,
-                collisions,
-                "dots_layer",
-            )
+            with profiler.stage("plot_puzzle_dots"):
+                if so.dot_rendering == "symbols":
+                    self.plot_puzzle_dot_symbols(dots, "dots_layer")
+                else:
+                    self.plot_puzzle_dots(
+                        dots,
+                        "dots_layer",
+                    )
 
+        centroids = cached.get("centroids") if cached is not None else None
         if so.plot_centroids:
-            ca = CentroidPlotter(self.svg)
-            ca.plot_puzzle_centroids(
-                "centroids_layer",
-                "solution_layer",
-                so.clearance,
-                so.fraction,
-                so.plane_fill,
-            )
+            with profiler.stage("plot_puzzle_centroids"):
+                ca = CentroidPlotter(self.svg, self.registry)
+                placements = ca.plot_puzzle_centroids(
+                    "centroids_layer",
+                    "solution_layer",
+                    so.clearance,
+                    so.fraction,
+                    so.plane_fill,
+                    so.placement,
+                    self.plane_index,
+                    centroids,
+                )
+            if centroids is None:
+                centroids = placements
+                cached = None  # Store the new centroid positions
+
+        if so.use_cache and cached is None:
+            with profiler.stage("mapping_cache"):
+                cache.put(
+                    cache_key,
+                    {
+                        "dots": dots.to_dict(),
+                        "collision_pairs": collision_pairs,
+                        "centroids": centroids,
+                    },
+                )
 
         # Plot the Instructions
         if so.plot_sequence:
-            self.plot_letter_sequence(dot_connections)
-
-        # Add footer
-        if so.plot_footer:
-            paper_size = self.get_paper_size_info(self.svg)
-            self.plot_footer(
-                so.copyright_text,
-                paper_size,
-            )
+            with profiler.stage("plot_letter_sequence"):
+                self.plot_letter_sequence(dots)
+
+        with profiler.stage("plot_page_text"):
+            # Add footer
+            if so.plot_footer:
+                paper_size = self.get_paper_size_info(self.svg)
+                self.plot_footer(
+                    so.copyright_text,
+                    paper_size,
+                )
 
-        self.plot_title(
-            so.title,
-            so.subtitle,
-        )
-        self.plot_caption(so.caption)
-        if so.puzzle_level:
-            self.plot_difficulty_level(so.puzzle_level)
-        else:
-            self.plot_difficulty_level(level=(len(dot_connections) // 200) + 2)
+            self.plot_title(
+                so.title,
+                so.subtitle,
+            )
+            self.plot_caption(so.caption)
+            if so.puzzle_level:
+                self.plot_difficulty_level(so.puzzle_level)
+            else:
+                self.plot_difficulty_level(level=(dots.step_count // 200) + 2)
 
         # ADVANCED OPTIONS
         if so.plot_reference_sequence:
-            self.plot_reference_sequence()
+            with profiler.stage("plot_reference_sequence"):
+                self.plot_reference_sequence(len(dots))
 
         # Perform analysis and plot stats
-        self.perform_analysis(
-            dot_connections,
-            collisions,
-            sorted_dots,
-            lowest_distance,
-            avg_distance,
-            highest_distance,
-            planes,
-            so.title,
-            so.subtitle,
-        )
+        with profiler.stage("stats_pages"):
+            self.perform_analysis(
+                dots,
+                collision_pairs,
+                sorted_steps,
+                lowest_distance,
+                avg_distance,
+                highest_distance,
+                planes,
+                so.title,
+                so.subtitle,
+            )
+
+        self.report_profile(profiler)
+
+    def report_profile(self, profiler):
+        """Print the stage timings or write them next to the SVG"""
+        so = self.options
+        output_name = self.svg.get("sodipodi:docname", "").split(".")[0] or "puzzle"
+        current_folder = self.svg_path(os.getcwd())
+        if so.profile_report == "debug":
+            inkex.utils.debug(profiler.format())
+        elif so.profile_report == "json":
+            profiler.write_json(
+                os.path.join(current_folder, f"{output_name}_profile.json")
+            )
+        if so.profile_dump:
+            profiler.dump_profile(
+                os.path.join(current_folder, f"{output_name}_profile.prof")
+            )
 
     def plot_caption(self, caption):
-        layer = self.svg.getElementById("instructions_layer")
-        bx, by = self.svg.getElementById("guide_bottom").position
-        rx, _ = self.svg.getElementById("puzzle_guide_right").position
+        layer = self.registry.get("instructions_layer")
+        bx, by = self.registry.get("guide_bottom").position
+        rx, _ = self.registry.get("puzzle_guide_right").position
         caption_element = TextElement(id="caption_textbox")
         caption_element.style = Style(
             {
@@ -175,7 +268,7 @@ class CreatePuzzle(EffectExtension):
 
     def get_selected_elements(self):
         # Get the selected elements, source path, or first path in the document
-        source_p: PathElement = self.svg.getElementById("source_path")
+        source_p: PathElement = self.registry.get("source_path")
         fallback_p: PathElement = next(
             iter(self.document.xpath("//svg:path", namespaces=NSS)), None
         )
@@ -204,9 +297,9 @@ class CreatePuzzle(EffectExtension):
 
     def perform_analysis(
         self,
-        dot_connections,
-        collisions,
-        sorted_dots,
+        dots,
+        collision_pairs,
+        sorted_steps,
         lowest_distance,
         avg_distance,
         highest_distance,
@@ -214,33 +307,36 @@ class CreatePuzzle(EffectExtension):
         title,
         subtitle,
     ):
-        # Combine mappings and write data to a file
         current_file_name = self.svg.get("sodipodi:docname", "")  # Get doc name
         output_name = current_file_name.split(".")[0]  # Remove the file extension
 
         # Perform analysis and plot stats
-        unique_dots = self.get_unique_dots(dot_connections)
-        sequence = self.svg.getElementById("sequence_string_textbox_tspan").text
-        stats = f"{len(dot_connections)} steps, {len(unique_dots)} unique dots, {round(lowest_distance)} min {round(avg_distance)} avg {round(highest_distance)} max, {planes} planes"
-        mappings = {
-            "collisions": collisions,
-            "sorted_dots": sorted_dots,
-            "dot_connections": dot_connections,
-            "sequence": sequence,
-            "stats": stats,
-        }
-        self.append_stats_page(stats, sorted_dots, title, subtitle, output_name)
+        stats = f"{dots.step_count} steps, {len(dots)} unique dots, {round(lowest_distance)} min {round(avg_distance)} avg {round(highest_distance)} max, {planes} planes"
+        self.append_stats_page(
+            stats,
+            dots,
+            sorted_steps,
+            title,
+            subtitle,
+            output_name,
+        )
 
-        # Write combined mappings to a single JSON file
-        # self.write_mappings_to_file(mappings, f"{output_name}_combined_mappings.json")
+        # Stream the dots, connections and collisions next to the SVG
+        if self.options.export_format != "none":
+            self.export_puzzle(
+                f"{output_name or 'puzzle'}_mappings",
+                self.options.export_format,
+                dots,
+                collision_pairs,
+                {"stats": stats, "collisions": dots.collision_count()},
+            )
 
     def process_puzzle_path(self, selected_path, rgb_color):
-        hex_color = "#{:02x}{:02x}{:02x}".format(*inkex.Color(rgb_color).to_rgb())
-        xpath_query = f".//*[@style and contains(@style, 'fill:{hex_color}')]"
-        planes_to_color = self.svg.xpath(xpath_query, namespaces=inkex.NSS)
+        self.plane_index = PlaneIndex(self.svg, rgb_color)
+        planes_to_color = self.plane_index.elements()
 
         puzzle_path = selected_path[0]
-        puzzle_path.set("id", "source_path")
+        self.registry.register(puzzle_path, "source_path")
         puzzle_path.style = Style(
             {
                 "stroke": "#000000",
@@ -248,11 +344,11 @@ class CreatePuzzle(EffectExtension):
                 "fill": "none",
             }
         )
-        layer = self.svg.getElementById("solution_layer")
+        layer = self.registry.get("solution_layer")
         layer.append(puzzle_path)
         # align to center of 'puzzle guide center'
         puzzle_path_center = puzzle_path.bounding_box().center
-        guide: Guide = self.svg.getElementById("guide_center")
+        guide: Guide = self.registry.get("guide_center")
         x_guide, y_guide = guide.position
         dx = x_guide - puzzle_path_center[0]
         dy = y_guide - puzzle_path_center[1]
@@ -272,13 +368,12 @@ class CreatePuzzle(EffectExtension):
         first_page.set("width", self.svg.get("width"))
         first_page.set("height", self.svg.get("height"))
 
-    def append_stats_page(self, stats, sorted_dots, title, subtitle, number):
-        connections_str = self.svg.getElementById("sequence_string_textbox_tspan").text
-        xl, y = self.svg.getElementById("guide_summary").position
-        xr, _ = self.svg.getElementById("stats_guide_right").position
+    def append_stats_page(self, stats, dots, sorted_steps, title, subtitle, number):
+        xl, y = self.registry.get("guide_summary").position
+        xr, _ = self.registry.get("stats_guide_right").position
         width = xr - xl
 
-        self.svg.getElementById("stats_layer").append(
+        self.registry.get("stats_layer").append(
             self.add_text_in_rect(
                 stats,
                 "mapping_textbox",
@@ -291,9 +386,9 @@ class CreatePuzzle(EffectExtension):
             )
         )
 
-        guide_puzzle_title = self.svg.getElementById("guide_puzzle_title")
+        guide_puzzle_title = self.registry.get("guide_puzzle_title")
         x, y = guide_puzzle_title.position
-        self.svg.getElementById("stats_layer").append(
+        self.registry.get("stats_layer").append(
             self.add_text_in_rect(
                 f"Nr: {number}\n Title: {title}\nSubtitle: {subtitle}\n",
                 "puzzle_data_textbox",
@@ -306,42 +401,24 @@ class CreatePuzzle(EffectExtension):
             )
         )
 
-        self.make_histogram(sorted_dots, 10)
-        self.make_connections_histogram(connections_str)
+        self.make_histogram(dots, sorted_steps, 10)
+        self.make_connections_histogram(dots)
 
-    def make_histogram(self, sorted_dots, num_bins=10):
-        distances = []
-        for i in range(len(sorted_dots) - 1):
-            dot1 = sorted_dots[i]
-            dot2 = sorted_dots[i + 1]
-            d = math.sqrt((dot1["x"] - dot2["x"]) ** 2 + (dot1["y"] - dot2["y"]) ** 2)
-            distances.append(d)
-
-        # Find the minimum and maximum distances
-        min_distance = min(distances)
-        max_distance = max(distances)
-
-        # Calculate the bin width
-        bin_width = (max_distance - min_distance) / num_bins
-
-        # Initialize distance bins
-        distance_bins = {min_distance + i * bin_width: 0 for i in range(num_bins)}
-
-        # Count occurrences within each bin
-        for d in distances:
-            for bin_start, bin_end in distance_bins.items():
-                if bin_start <= d < bin_start + bin_width:
-                    distance_bins[bin_start] += 1
+    def make_histogram(self, dots, sorted_steps, num_bins=10):
+        dot_statistics = DotStatistics(dots.step_coordinates(sorted_steps))
+        distances = dot_statistics.step_distances()
+        distance_bins, bin_width = dot_statistics.histogram(distances, num_bins)
 
         # Create a group for the histogram
-        histogram_group = self.svg.add(Group())
-        histogram_group.set("id", "histogram_group")
+        histogram_group = self.registry.register(
+            self.svg.add(Group()), "histogram_group"
+        )
 
         # Append text elements for each bin to stats_layer
-        self.svg.getElementById("stats_layer").append(histogram_group)
-        x, y = self.svg.getElementById("guide_histogram").position
+        self.registry.get("stats_layer").append(histogram_group)
+        x, y = self.registry.get("guide_histogram").position
 
-        for bin_start, count in sorted(distance_bins.items()):
+        for bin_start, count in distance_bins:
             bin_end = bin_start + bin_width
             bin_width_text = f"{round(bin_start, 2)} - {round(bin_end, 2)} ({count})"
             label_text = str(round(bin_start))
@@ -366,13 +443,13 @@ class CreatePuzzle(EffectExtension):
                 font_size="6pt",
             )
 
-            self.svg.getElementById("histogram_group").append(histogram_bar)
-            self.svg.getElementById("histogram_group").append(label)
+            histogram_group.append(histogram_bar)
+            histogram_group.append(label)
 
             y += 20  # Increase y coordinate for next appended element
 
-    def make_connections_histogram(self, connections_str: str):
-        x, y = self.svg.getElementById("guide_connections").position
+    def make_connections_histogram(self, dots: DotTable):
+        x, y = self.registry.get("guide_connections").position
         text_element = TextElement(
             x="",
             y="",
@@ -384,29 +461,19 @@ class CreatePuzzle(EffectExtension):
                 "font-size": "10pt",
             }
         )
-        cnx_count = {}
-
-        # Split the sequence into individual connections
-        cnxs = connections_str.split()
-        singular_cnxs = 0
-
-        # Iterate over each connection
-        for i in range(len(cnxs) - 1):
-            cnx = sorted([cnxs[i], cnxs[i + 1]])
-            cnx = " ".join(cnx)
-            cnx_count[cnx] = cnx_count.get(cnx, 0) + 1
-            if cnx_count[cnx] == 1:
-                singular_cnxs += 1
-
-        sorted_cnxs = sorted(cnx_count.items(), key=lambda x: x[1], reverse=True)
+        # The connections are counted while the mapping is created
+        sorted_cnxs = [
+            (sorted([dots.label(a), dots.label(b)]), count)
+            for (a, b), count in dots.connections.by_count()
+        ]
         cnxs_by_count = {}
         for cnx, count in sorted_cnxs:
             cnxs_by_count[count] = cnxs_by_count.get(count, [])
-            cnxs_by_count[count].append(cnx)
+            cnxs_by_count[count].append(" ".join(cnx))
 
         # Plotting connections after all iterations
-        for cnx, count in sorted_cnxs:
-            self.mark_connection(cnx, count)
+        for (left_dot, right_dot), count in sorted_cnxs:
+            self.mark_connection(left_dot, right_dot, count)
 
         # Plotting connections grouped by count
         for count, cnxs in cnxs_by_count.items():
@@ -428,24 +495,25 @@ class CreatePuzzle(EffectExtension):
                 )
             )
 
-        self.svg.getElementById("stats_layer").append(text_element)
+        self.registry.get("stats_layer").append(text_element)
 
-    def mark_connection(self, connection, count):
+    def mark_connection(self, left_dot: str, right_dot: str, count: int):
         color = "none"
         if count > 1:
             color = "orange"
         if count > 2:
             color = "red"
+        if color == "none" and self.options.dot_rendering == "symbols":
+            return  # Keep the uses of the dot symbol bare
 
-        left_dot, right_dot = connection.split()
         markStyle = Style({"stroke": color, "stroke-width": "2pt"})
 
-        self.svg.getElementById(f"black_dot_{left_dot}").style = markStyle
-        self.svg.getElementById(f"black_dot_{right_dot}").style = markStyle
+        self.registry.get(f"black_dot_{left_dot}").style = markStyle
+        self.registry.get(f"black_dot_{right_dot}").style = markStyle
 
     def plot_title(self, title_field: str, subtitle: str):
-        layer = self.svg.getElementById("instructions_layer")
-        x, y = self.svg.getElementById("guide_title").position
+        layer = self.registry.get("instructions_layer")
+        x, y = self.registry.get("guide_title").position
         title_element = TextElement(x=str(x), y=str(y), id="title_textbox")
         layer.append(title_element)
 
@@ -475,9 +543,9 @@ class CreatePuzzle(EffectExtension):
         copyright_text: str,
         paper_size="A4",
     ):
-        layer = self.svg.getElementById("instructions_layer")
-        _, y = self.svg.getElementById("guide_bottom").position
-        x, _ = self.svg.getElementById("instructions_guide_left").position
+        layer = self.registry.get("instructions_layer")
+        _, y = self.registry.get("guide_bottom").position
+        x, _ = self.registry.get("instructions_guide_left").position
 
         footer = TextElement(x=str(x), y=str(y), id="footer_textbox")
         layer.append(footer)
@@ -505,11 +573,10 @@ class CreatePuzzle(EffectExtension):
     def plot_difficulty_level(self, level: int):
         # Calculate the difficulty level based on the number of steps
 
-        grouped_brains = Group()
-        grouped_brains.set("id", "grouped_brains")
+        grouped_brains = self.registry.register(Group(), "grouped_brains")
 
-        self.svg.getElementById("instructions_layer").append(grouped_brains)
-        layer = self.svg.getElementById("instructions_layer")
+        layer = self.registry.get("instructions_layer")
+        layer.append(grouped_brains)
 
         for i in range(5):
             brain_character = PathElement(id=f"brain_character_{i}")
@@ -519,8 +586,8 @@ class CreatePuzzle(EffectExtension):
 
             # Set the position of the brain character
             dy = brain_character.bounding_box().height
-            _, y = self.svg.getElementById("guide_title").position
-            x, _ = self.svg.getElementById("guide_sequence").position
+            _, y = self.registry.get("guide_title").position
+            x, _ = self.registry.get("guide_sequence").position
 
             brain_character.transform = f"translate({x - ((i+1) * 25)}, {y-dy + 4})"
 
@@ -534,41 +601,74 @@ class CreatePuzzle(EffectExtension):
 
         layer.append(grouped_brains)
 
-    def check_density(self, dots: list, minimal_distance: int):
-        for dot in dots:
-            dot["has_collision"] = False
-            for other_dot in dots:
-                if dot["letter_label"] != other_dot["letter_label"]:
-                    distance = math.sqrt(
-                        (dot["x"] - other_dot["x"]) ** 2
-                        + (dot["y"] - other_dot["y"]) ** 2
-                    )
-                    dot["distance"] = round(distance, 2)
-                    dot["collides_with"] = other_dot["letter_label"]
-                    if distance <= minimal_distance:
-                        dot["has_collision"] = True
-                        break
-        sorted_dots = sorted(dots, key=lambda k: k["distance"])
-        colliding_dots = [dot for dot in sorted_dots if dot["has_collision"]]
-        all_distances = [dot["distance"] for dot in sorted_dots]
-        return colliding_dots, sorted_dots, all_distances
-
-    def evaluate_distances(self, sorted_distances):
-        num_distances = len(sorted_distances)
-        total_distance = sum(distance["distance"] for distance in sorted_distances)
-        avg_distance = total_distance / num_distances if num_distances > 0 else 0
-        lowest_distance = sorted_distances[0]["distance"]
-        highest_distance = sorted_distances[-1]["distance"]
-
-        return avg_distance, lowest_distance, highest_distance
+    def check_density(self, dots: DotTable, minimal_distance: int):
+        """Find the nearest neighbour of every dot and the colliding pairs"""
+        return core_mapping.check_density(dots, minimal_distance)
 
-    def count_planes(self, puzzle_planes_id, plane_fill):
-        processed_planes = self.svg.getElementById(puzzle_planes_id)
-        xpath_query = f".//*[@style and contains(@style, 'fill:{plane_fill}')]"
-        planes_with_fill = self.svg.xpath(xpath_query)
-        number_of_f_planes = (
-            len(planes_with_fill) if planes_with_fill is not None else 0
+    def relax_collisions(self, dots: DotTable, collision_pairs: list):
+        """Nudge colliding dots apart and report the collisions that remain"""
+        so = self.options
+        iterations, moved = relaxation.relax_dots(
+            dots, so.minimal_distance, so.max_displacement
         )
+        residual_pairs = self.check_density(dots, so.minimal_distance)
+        inkex.utils.debug(
+            f"Relaxed {len(collision_pairs)} collisions by moving {len(moved)} dots "
+            f"in {iterations} iterations, {len(residual_pairs)} collisions remain"
+        )
+        if residual_pairs:
+            # Only the closest pairs, a dense drawing can leave thousands
+            closest = sorted(residual_pairs, key=lambda pair: pair[2])
+            inkex.utils.debug(
+                "Closest remaining pairs: "
+                + ", ".join(
+                    f"{dots.label(a)} {dots.label(b)} ({distance})"
+                    for a, b, distance in closest[: self.residual_pairs_shown]
+                )
+                + (", ..." if len(closest) > self.residual_pairs_shown else "")
+            )
+        return residual_pairs
+
+    def get_mapping_cache(self, elements: list):
+        """Return the mapping cache and the key of the geometry and options"""
+        so = self.options
+        folder = so.cache_dir or os.path.join(
+            self.svg_path(os.getcwd()), ".puzzle_cache"
+        )
+        # The centroids depend on the planes, so their geometry is keyed too
+        geometry = [
+            [str(element.path), str(element.composed_transform())]
+            for element in list(elements) + self.plane_index.elements()
+        ]
+        key = MappingCache.key(
+            geometry,
+            so.start,
+            so.minimal_distance,
+            so.clearance,
+            so.fraction,
+            so.plane_fill,
+            so.placement,
+            so.route,
+            so.relax_collisions,
+            so.max_displacement,
+            self.coding_sequence,
+            self.label_width,
+        )
+        return MappingCache(folder), key
+
+    def restore_mapping(self, cached):
+        """Rebuild the dot table and collision pairs of a cache entry"""
+        dots = DotTable.from_dict(cached["dots"], self.label_codec)
+        collision_pairs = [tuple(pair) for pair in cached["collision_pairs"]]
+        return dots, collision_pairs
+
+    def evaluate_distances(self, dots: DotTable, sorted_steps):
+        distances = dots.step_distances()
+        return core_mapping.evaluate_distances([distances[s] for s in sorted_steps])
+
+    def count_planes(self, puzzle_planes_id, plane_fill):
+        processed_planes = self.registry.get(puzzle_planes_id)
+        number_of_f_planes = len(self.plane_index)
         number_of_planes = len(processed_planes) if processed_planes is not None else 0
 
         return number_of_planes or number_of_f_planes
@@ -579,137 +679,50 @@ class CreatePuzzle(EffectExtension):
         root_group.transform = "translate(0, 0)"
         return root_group
 
-    def plot_reference_sequence(self):
-        """Create a reference sequence of the letters"""
-        reference_sequence_group = self.createRootGroup("reference_sequence")
-
-        xr, y = self.svg.getElementById("guide_sequence").position
-        xl, _ = self.svg.getElementById("instructions_guide_left").position
-        x = xl
-        width = xr - xl
-
-        # Calculate the maximum number based on the length of coding_sequence
-        max_number = len(self.coding_sequence) ** 2
+    def plot_reference_sequence(self, number_of_dots=0):
+        """Create a reference sequence of the letters
 
-        # Create a rectangle element
-        rect = Rectangle(
-            x=str(x),
-            y=str(y),
-            width=str(width),
-            height=str(1000),  # Arbitrary height to fit the text
-            id="reference_sequence_rect",
-        )
-
-        # Add the rectangle to the <defs> section
-        self.svg.defs.append(rect)
+        All labels of the smallest width are listed, followed by any wider
+        labels needed for the given number of dots.
+        """
+        reference_sequence_group = self.createRootGroup("reference_sequence")
 
-        # Create a text element inside the rectangle
-        text_element = TextElement(
-            x=str(x),
-            y=str(y),
-            id="reference_sequence_textbox",
+        # Calculate the maximum number based on the label codec
+        max_number = max(self.label_codec.capacity, number_of_dots)
+        words = (
+            (self.label_codec.encode(number), " ")
+            for number in range(1, max_number + 1)
         )
-        text_element.set("shape-inside", f"url(#{rect.get('id')})")
-        text_element.style = self.fontConsolas
-        text_element.style["fill"] = "#000000"
 
-        # Add the text element to the document
-        reference_sequence_group.append(text_element)
-
-        # Add the reference sequence
-        reference_sequence = ""
-        for i in range(1, max_number + 1):
-            reference_sequence += self.get_letter_id_from_number(i) + " "
-
-        reference_sequence_group.append(
-            self.add_text_in_rect(
-                reference_sequence,
-                "reference_sequence_textbox",
-                "reference_sequence_rect",
-                x=str(xl),
-                y=str(y),
-            )
+        return self.plot_sequence_pages(
+            words, "reference_sequence_textbox", reference_sequence_group
         )
 
-        return reference_sequence
-
-    def get_unique_dots(self, mapping: list):
-        """Get the unique dots from the mapping"""
-        unique_dots = []
-
-        for entry in mapping:
-            x = entry["x"]
-            y = entry["y"]
-            letter_label = entry["letter_label"]
-
-            # Check if the dot is already in unique_dots
-            exists = False
-            for dot in unique_dots:
-                if (
-                    dot["x"] == x
-                    and dot["y"] == y
-                    and dot["letter_label"] == letter_label
-                ):
-                    exists = True
-                    break
-
-            # If it's not in unique_dots, add it
-            if not exists:
-                unique_dots.append({"x": x, "y": y, "letter_label": letter_label})
-
-        return unique_dots
-
     def plot_puzzle_dots(
         self,
-        mapping: list,
-        collisions: list,
+        dots: DotTable,
         layer_id,
     ):
-        """Plot the mapping to the canvas"""
+        """Plot the unique dots to the canvas"""
+        layer = self.registry.get(layer_id)
 
-        unique_dots = []
-
-        # Remove duplicate dots
-        for entry in mapping:
-            x = entry["x"]
-            y = entry["y"]
-            letter_element = entry["letter_label"]
-
-            # Check if the dot is already in unique_dots
-            exists = False
-            for dot in unique_dots:
-                if (
-                    dot["x"] == x
-                    and dot["y"] == y
-                    and dot["letter_label"] == letter_element
-                ):
-                    exists = True
-                    break
-
-            # If it's not in unique_dots, add it
-            if not exists:
-                unique_dots.append({"x": x, "y": y, "letter_label": letter_element})
-
-        for step in unique_dots:
-            x_center = step["x"]  # Center of the circle
-            y_center = step["y"]
+        for dot, (x_center, y_center) in enumerate(dots.coordinates()):
+            letter_label = dots.label(dot)
 
             # Verify is the dot is colliding with another dot
-            collision_exists = False
-            for collision in collisions:
-                if collision["letter_label"] == step["letter_label"]:
-                    collision_exists = True
-                    break
+            collision_exists = dots.has_collision[dot]
 
             # Add the text label
-            text_element_with_label = self.svg.getElementById(layer_id).add(
+            text_element_with_label = layer.add(
                 TextElement(x=str(x_center), y=str(y_center))
             )
             # make the text center horitzontally
-            text_element_with_label.text = f"{step['letter_label']}"
+            text_element_with_label.text = letter_label
             text_element_with_label.set("text-anchor", "middle")
             text_element_with_label.set("dominant-baseline", "middle")
-            text_element_with_label.set("id", f"text_label_{step['letter_label']}")
+            self.registry.register(
+                text_element_with_label, f"text_label_{letter_label}"
+            )
             text_element_with_label.style = self.fontConsolas
             text_element_with_label.set("letter-spacing", "1px")
             #  make red when collision
@@ -722,14 +735,54 @@ class CreatePuzzle(EffectExtension):
                 y_center,
                 0.7,
                 fill="#000000",
-                id=f"black_dot_{step['letter_label']}",
+                id=f"black_dot_{letter_label}",
             )
 
-            current_dot_group = self.svg.getElementById(layer_id).add(Group())
-            current_dot_group.set("id", f"{step['letter_label']}")
+            self.registry.register(black_circle)
+            current_dot_group = self.registry.register(layer.add(Group()), letter_label)
             current_dot_group.append(black_circle)
             current_dot_group.append(text_element_with_label)
 
+    def plot_puzzle_dot_symbols(self, dots: DotTable, layer_id):
+        """Plot the unique dots as uses of one symbol with class-styled labels
+
+        The dot is defined once as a symbol and the label style once as a CSS
+        class in the defs, so every dot is a bare use and a bare text element.
+        """
+        layer = self.registry.get(layer_id)
+
+        dot_symbol = Symbol(id="puzzle_dot")
+        dot_symbol.set("overflow", "visible")
+        dot_symbol.append(Circle(r="0.7", style="fill:#000000"))
+        self.svg.defs.append(dot_symbol)
+
+        label_style = StyleElement(id="puzzle_dot_style")
+        label_style.text = (
+            f".dot-label{{{self.fontConsolas};text-anchor:middle;"
+            "dominant-baseline:middle;letter-spacing:1px}"
+            ".dot-label.collision{fill:#ff0000}"
+        )
+        self.svg.defs.append(label_style)
+
+        for dot, (x, y) in enumerate(dots.coordinates()):
+            x_center = str(x)
+            y_center = str(y)
+            letter_label = dots.label(dot)
+
+            # The id is kept, as mark_connection restyles the dot by id. The SVG2
+            # href needs no xlink namespace, which lxml would declare on every use
+            black_dot = Use(x=x_center, y=y_center)
+            black_dot.set("href", "#puzzle_dot")
+            layer.append(self.registry.register(black_dot, f"black_dot_{letter_label}"))
+
+            label = TextElement(x=x_center, y=y_center)
+            label.text = letter_label
+            label.set(
+                "class",
+                "dot-label collision" if dots.has_collision[dot] else "dot-label",
+            )
+            layer.append(label)
+
     def createCircle(self, x: int, y: int, radius: int, fill="#ffffff", id=""):
         """Create a circle element"""
         circle = Circle(cx=str(x), cy=str(y), r=str(radius))
@@ -741,76 +794,114 @@ class CreatePuzzle(EffectExtension):
         circle.set("id", id)
         return circle
 
-    def plot_letter_sequence(self, mapping: list):
+    def plot_letter_sequence(self, dots: DotTable):
         """Plot the mapping to the canvas"""
-        sequence_string = " ".join(
-            item["letter_label"] + ("  " if (index + 1) % 5 == 0 and index != 0 else "")
-            for index, item in enumerate(mapping)
+        # Every fifth label is followed by a wider gap
+        words = (
+            (letter_label, "   " if (index + 1) % 5 == 0 else " ")
+            for index, letter_label in enumerate(dots.step_labels())
         )
-        xr, y = self.svg.getElementById("guide_sequence").position
-        xl, _ = self.svg.getElementById("instructions_guide_left").position
-        x = xl
-        width = xr - xl
-
-        element = self.add_text_in_rect(
-            sequence_string,
+        self.plot_sequence_pages(
+            words,
             "sequence_string_textbox",
-            "sequence_string_rect",
-            x,
-            y,
-            width=width,
+            self.registry.get("instructions_layer"),
         )
-        self.svg.getElementById("instructions_layer").append(element)
-
-    def create_mapping(self, elements: list):
-        """Create a mapping of letter IDs, numbers, and coordinates"""
-        result_mapping = []
-        coord_to_label = {}  # Dictionary for efficient coordinate lookup
-        dot_number = self.options.start - 1
-
-        for pathElement in elements:
-            path: Path = pathElement.path
-            path_trans_applied = path.transform(pathElement.composed_transform())
-
-            previous_point = None
-
-            for _, (x, y) in enumerate(path_trans_applied.end_points):
-                x_rounded = round(x)
-                y_rounded = round(y)
-                current_point = (x_rounded, y_rounded)
-
-                if current_point in coord_to_label:
-                    # Coordinate already exists, use the same label
-                    letter_label = coord_to_label[current_point]
-                else:
-                    # New coordinate, generate a new label and store it
-                    next_unique_dot_number = len(coord_to_label) + 1
-                    letter_label = self.get_letter_id_from_number(
-                        next_unique_dot_number
-                    )
-                    coord_to_label[current_point] = letter_label
 
-                # Increment the dot number if the current point is different from the previous point
-                if current_point != previous_point:
-                    dot_number += 1
+    def plot_sequence_pages(self, words, text_id: str, parent, font_size="11pt"):
+        """Lay out (word, separator) pairs as lines of text on instruction pages
+
+        The lines are broken to the width between the sequence guides using
+        the monospace metrics of the font, one Tspan per line, so no flowed
+        text has to be reflowed. A sequence that does not fit continues on
+        extra instruction pages to the left of the first one.
+        """
+        xr, y = self.registry.get("guide_sequence").position
+        xl, _ = self.registry.get("instructions_guide_left").position
+        page = self.pages["instructions"]
+        page_width, page_height = int(page["width"]), int(page["height"])
+        margin = xl - int(page["x"])
+        layout = SequenceLayout(
+            xr - xl, page_height - y - margin, self.svg.unittouu(font_size)
+        )
 
-                # Add the mapping to the result
-                result_mapping.append(
-                    {
-                        "x": x_rounded,
-                        "y": y_rounded,
-                        "dot_number": dot_number,
-                        "letter_label": letter_label,
-                    }
-                )
+        text_elements = []
+        for number, lines in enumerate(layout.pages(words)):
+            offset = number * (page_width + 50)
+            if number:
+                self.add_instructions_page(number + 1, offset)
 
-        return result_mapping
+            text_element = TextElement(
+                id=text_id if number == 0 else f"{text_id}_{number + 1}"
+            )
+            text_element.style = self.fontConsolas
+            text_element.style["font-size"] = font_size
+            text_element.set("xml:space", "preserve")
+            for row, line in enumerate(lines, 1):
+                tspan = Tspan(line)
+                tspan.set("x", str(xl - offset))
+                tspan.set("y", str(y + row * layout.line_height))
+                text_element.append(tspan)
+
+            parent.append(self.registry.register(text_element))
+            text_elements.append(text_element)
+
+        return text_elements
+
+    def add_instructions_page(self, number: int, offset):
+        """Add an extra instructions page, offset to the left of the first"""
+        page = self.pages["instructions"]
+        existing_page = self.registry.get(f"{page['id']}_{number}")
+        if existing_page is not None:
+            return existing_page
+
+        new_page: Page = self.svg.namedview.new_page(
+            str(int(page["x"]) - offset),
+            str(page["y"]),
+            str(page["width"]),
+            str(page["height"]),
+            f"{page['label']} {number}",
+        )
+        new_page.set("margin", page["margin"])
+        return self.registry.register(new_page, f"{page['id']}_{number}")
 
-    def write_mappings_to_file(self, combined_mapping, filename):
-        """Write the combined mappings to a file"""
-        current_folder = self.svg_path()
-        with open(f"{current_folder}/{filename}", "w") as f:
-            json.dump(combined_mapping, f)
+    def create_mapping(self, elements: list):
+        """Create a mapping of letter IDs, numbers, and coordinates
+
+        Returns the table of unique dots in order of appearance, with one
+        step per path node.
+        """
+        segments = PathSegments(elements)
+        points = (segments.keys[node] for node in segments.walk)
+        return core_mapping.create_mapping(points, self.label_codec, self.options.start)
+
+    def optimize_route(self, dots: DotTable, method: str):
+        """Reorder the steps into a route that retraces fewer connections
+
+        The path order is kept when the route would not be shorter, which the
+        greedy route cannot guarantee.
+        """
+        start = dots.step_dot[0] if dots.step_count else None
+        route = core_route.optimize_route(dots.connections, start, method)
+        if len(route) >= dots.step_count:
+            logger.info(
+                "Keeping the path order, the %s route has %d steps instead of %d",
+                method,
+                len(route),
+                dots.step_count,
+            )
+            return dots
+        dots.replace_steps(route, self.options.start)
+        return dots
+
+    def export_puzzle(self, name, export_format, dots, collision_pairs, meta):
+        """Write the puzzle data to a file in the folder of the SVG"""
+        current_folder = self.svg_path(os.getcwd())
+        with PuzzleExporter(current_folder, name, export_format) as exporter:
+            exporter.write_meta(meta)
+            exporter.write_dots(dots)
+            exporter.write_connections(dots)
+            exporter.write_collisions(dots, collision_pairs)
+        return exporter.path
 
     # Define a method to set the style of dots based on their position
     def set_dot_style(self, circle, dot_number: int):
@@ -879,6 +970,8 @@ class CreatePuzzle(EffectExtension):
         tspan.set_id(f"{text_id}_tspan")
         tspan.text = text_string
         text_element.append(tspan)
+        self.registry.register(text_element)
+        self.registry.register(tspan)
 
         # Add the text element to the document
         self.svg.append(text_element)
@@ -886,52 +979,22 @@ class CreatePuzzle(EffectExtension):
         return text_element
 
     # Define a method to generate letter IDs
-    # The max number of dots can be 2074 (52*52)
+    # The first 3844 (62*62) dots get two letters, later dots get more
     def get_letter_id_from_number(self, number):
-        """Generate letter IDs from 1 to 2074"""
-
-        # Validate coding_sequence
-        if not self.coding_sequence or len(self.coding_sequence) < 2:
-            raise ValueError(
-                "Invalid coding_sequence. It should contain at least two characters."
-            )
-
-        # Calculate the maximum number based on the length of coding_sequence
-        max_number = len(self.coding_sequence) ** 2
-
-        if not 1 <= number <= max_number:
-            raise ValueError(
-                f"Number {number} is out of range. Should be between 1 and {max_number}."
-            )
-
-        letter_id_array = [letter for letter in self.coding_sequence]
-
-        first_letter_index = (number - 1) // len(letter_id_array)
-        second_letter_index = (number - 1) % len(letter_id_array)
-
-        first_letter = letter_id_array[first_letter_index % len(letter_id_array)]
-        second_letter = letter_id_array[second_letter_index]
-
-        return f"{first_letter}{second_letter}"
+        """Generate letter IDs, growing wider once two letters run out"""
+        return self.label_codec.encode(number)
 
     def get_number_from_letter_id(self, letter_id):
         """Retrieve the number from letter IDs"""
-        letter_id_array = [letter for letter in self.coding_sequence]
-
-        first_letter_index = letter_id_array.index(letter_id[0])
-        second_letter_index = letter_id_array.index(letter_id[1])
-
-        number = first_letter_index * len(letter_id_array) + second_letter_index + 1
-
-        return number
+        return self.label_codec.decode(letter_id)
 
-    def get_letter_id_from_coordinates(self, x, y, solution_table):
+    def get_letter_id_from_coordinates(self, x, y, dots: DotTable):
         """Retrieve the letter ID from coordinates"""
         X = math.ceil(x)
         Y = math.ceil(y)
-        for item in solution_table:
-            if item["x"] == X and item["y"] == Y:
-                return item["letter_label"]
+        for dot, (dot_x, dot_y) in enumerate(dots.coordinates()):
+            if dot_x == X and dot_y == Y:
+                return dots.label(dot)
         return None
 
     def cleanup(self):
@@ -940,7 +1003,7 @@ class CreatePuzzle(EffectExtension):
         if images and len(images) > 0:
             source_image = images[0]
             source_image.set("id", "source_image")
-            self.svg.getElementById("solution_layer").append(source_image)
+            self.registry.get("solution_layer").append(source_image)
 
 
 # Entry point of the script
@@ -110,84 +110,106 @@ def setup(self, so):
         guides = []
 
         guides.append(
-            svg.namedview.add_guide(
-                (r_x - pa, pa), (1, 0), f"{p['label']} guide right"
-            ).set("id", f"{page_id}_guide_right")
+            add_guide(
+                self,
+                (r_x - pa, pa),
+                (1, 0),
+                f"{p['label']} guide right",
+                f"{page_id}_guide_right",
+            )
         )
 
         guides.append(
-            svg.namedview.add_guide(
-                (l_x + pa, pa), (1, 0), f"{p['label']} guide left"
-            ).set("id", f"{page_id}_guide_left")
+            add_guide(
+                self,
+                (l_x + pa, pa),
+                (1, 0),
+                f"{p['label']} guide left",
+                f"{page_id}_guide_left",
+            )
         )
 
         if page_id == "puzzle":
             guides.append(
-                (
-                    svg.namedview.add_guide(
-                        (l_x + pa, height - pa), (0, -1), "Puzzle guide bottom"
-                    ).set("id", "guide_bottom"),
+                add_guide(
+                    self,
+                    (l_x + pa, height - pa),
+                    (0, -1),
+                    "Puzzle guide bottom",
+                    "guide_bottom",
                 )
             )
             guides.append(
-                (
-                    svg.namedview.add_guide(
-                        (l_x + width / 2, height / 2),
-                        (1, 0),
-                        "Puzzle guide center",
-                    ).set("id", "guide_center"),
+                add_guide(
+                    self,
+                    (l_x + width / 2, height / 2),
+                    (1, 0),
+                    "Puzzle guide center",
+                    "guide_center",
                 )
             )
             guides.append(
-                svg.namedview.add_guide((r_x - pa, pa), (0, -1), "Guide top").set(
-                    "id", f"{page_id}_guide_top"
+                add_guide(
+                    self, (r_x - pa, pa), (0, -1), "Guide top", f"{page_id}_guide_top"
                 )
             )
 
         if page_id == "instructions":
             guides.append(
-                (
-                    svg.namedview.add_guide(
-                        (l_x + pa, 3 * pa), (0, -1), "Instructions guide title"
-                    ).set("id", "guide_title"),
+                add_guide(
+                    self,
+                    (l_x + pa, 3 * pa),
+                    (0, -1),
+                    "Instructions guide title",
+                    "guide_title",
                 )
             )
 
             guides.append(
-                (
-                    svg.namedview.add_guide(
-                        (r_x - 3 * pa, 5 * pa), (0, -1), "Instructions guide sequence"
-                    ).set("id", "guide_sequence"),
+                add_guide(
+                    self,
+                    (r_x - 3 * pa, 5 * pa),
+                    (0, -1),
+                    "Instructions guide sequence",
+                    "guide_sequence",
                 )
             )
 
         if page_id == "stats":
             guides.append(
-                (
-                    svg.namedview.add_guide(
-                        (l_x + pa, 2 * pa), (0, -1), "Stats guide title"
-                    ).set("id", "guide_puzzle_title"),
+                add_guide(
+                    self,
+                    (l_x + pa, 2 * pa),
+                    (0, -1),
+                    "Stats guide title",
+                    "guide_puzzle_title",
                 )
             )
             guides.append(
-                (
-                    svg.namedview.add_guide(
-                        (l_x + pa, 3 * pa), (0, -1), "Stats guide summary"
-                    ).set("id", "guide_summary"),
+                add_guide(
+                    self,
+                    (l_x + pa, 3 * pa),
+                    (0, -1),
+                    "Stats guide summary",
+                    "guide_summary",
                 )
             )
             guides.append(
-                (
-                    svg.namedview.add_guide(
-                        (l_x + pa, 15 * pa), (0, -1), "Stats guide histogram"
-                    ).set("id", "guide_histogram"),
+                add_guide(
+                    self,
+                    (l_x + pa, 15 * pa),
+                    (0, -1),
+                    "Stats guide histogram",
+                    "guide_histogram",
                 )
             )
             guides.append(
-                (
-                    svg.namedview.add_guide(
-                        (l_x + pa, 7 * pa), (0, -1), "Stats guide connections"
-                    ).set("id", "guide_connections"),
+                add_guide(
+                    self,
+                    (l_x + pa, 7 * pa),
+                    (0, -1),
+                    "Stats guide connections",
+                    "guide_connections",
                 )
             )
 
@@ -215,3 +237,19 @@ def manage_layers(self, layers):
         new_layer = self.svg.add(Layer())
         new_layer.set("id", layer)
         new_layer.set("inkscape:label", layer)
+        register(self, new_layer)
+
+
+def add_guide(self, position, orient, label, id):
+    """Add a guide to the namedview and register it by id"""
+    guide = self.svg.namedview.add_guide(position, orient, label)
+    guide.set("id", id)
+    return register(self, guide)
+
+
+def register(self, element):
+    """Register an element with the extension's element registry, if any"""
+    registry = getattr(self, "registry", None)
+    if registry is not None:
+        registry.register(element)
+    return element
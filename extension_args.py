@@ -43,6 +43,14 @@ def add_arguments(pars):
         default=20,
     )
 
+    pars.add_argument(
+        "--placement",
+        type=str,
+        help="Placement of the centroids: grid or polylabel",
+        default="grid",
+        choices=["grid", "polylabel"],
+    )
+
     pars.add_argument(
         "--plane_fill",
         help="Fill color of the plane",
@@ -57,6 +65,22 @@ def add_arguments(pars):
         default=True,
     )
 
+    pars.add_argument(
+        "--dot_rendering",
+        type=str,
+        help="Render every dot as its own elements, or as uses of one symbol",
+        default="elements",
+        choices=["elements", "symbols"],
+    )
+
+    pars.add_argument(
+        "--route",
+        type=str,
+        help="Order of the sequence: the path, or a route that retraces less",
+        default="path",
+        choices=["path", "postman", "greedy"],
+    )
+
     pars.add_argument(
         "--plot_sequence",
         type=Boolean,
@@ -78,6 +102,20 @@ def add_arguments(pars):
         default=6,
     )
 
+    pars.add_argument(
+        "--relax_collisions",
+        type=Boolean,
+        help="Nudge colliding dots apart until they respect the minimal distance",
+        default=False,
+    )
+
+    pars.add_argument(
+        "--max_displacement",
+        type=float,
+        help="How far a dot may be nudged from its node when relaxing collisions",
+        default=3.0,
+    )
+
     pars.add_argument(
         "--replace_dots",
         type=Boolean,
@@ -99,6 +137,43 @@ def add_arguments(pars):
         default=True,
     )
 
+    pars.add_argument(
+        "--export_format",
+        type=str,
+        help="Export the dots, connections and collisions next to the SVG: none, ndjson or binary",
+        default="none",
+        choices=["none", "ndjson", "binary"],
+    )
+
+    pars.add_argument(
+        "--use_cache",
+        type=Boolean,
+        help="Reuse the mapping, collisions and centroids of an earlier run on the same geometry",
+        default=False,
+    )
+
+    pars.add_argument(
+        "--cache_dir",
+        type=str,
+        help="Folder of the mapping cache. Default is .puzzle_cache next to the SVG",
+        default="",
+    )
+
+    pars.add_argument(
+        "--profile_report",
+        type=str,
+        help="Report the time and created elements of every stage: none, debug or json",
+        default="none",
+        choices=["none", "debug", "json"],
+    )
+
+    pars.add_argument(
+        "--profile_dump",
+        type=Boolean,
+        help="Write a cProfile dump of the stages next to the SVG",
+        default=False,
+    )
+
     pars.add_argument(
         "--title",
         type=str,
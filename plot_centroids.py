@@ -41,6 +41,14 @@ class CentroidPlotExtension(EffectExtension):
             default=20,
         )
 
+        pars.add_argument(
+            "--placement",
+            type=str,
+            help="Placement of the centroids: grid or polylabel",
+            default="grid",
+            choices=["grid", "polylabel"],
+        )
+
         pars.add_argument(
             "--plane_fill",
             help="Fill color of the plane",
@@ -57,6 +65,7 @@ class CentroidPlotExtension(EffectExtension):
             so.clearance,
             so.fraction,
             so.plane_fill,
+            so.placement,
         )
 
 
@@ -18,6 +18,12 @@ class PublishPuzzleExtension(inkex.EffectExtension):
         for circle in circle_elements:
             circle.style["stroke"] = "black"
 
+        # Dots rendered as symbols share the circle of the symbol
+        dot_symbol = self.svg.getElementById("puzzle_dot")
+        if dot_symbol is not None:
+            for circle in dot_symbol.iterchildren():
+                circle.style["stroke"] = "black"
+
 
 if __name__ == "__main__":
     PublishPuzzleExtension().run()
@@ -0,0 +1,57 @@
+from array import array
+
+
+class ConnectionGraph:
+    """
+    The connections between the dots of a puzzle, as an edge multigraph.
+
+    Every pair of consecutive steps of the path connects two dots. An edge
+    is keyed by the rows of its two dots, lowest first, and counts how often
+    the path connects them. A step that stays on the same dot is a loop.
+
+    Attributes:
+        edges (dict): The multiplicity of every edge, in order of first use.
+        degree (array): The number of edge ends at every dot up to the
+            highest connected one, where a loop counts twice.
+
+    Methods:
+        add(a, b): Adds one connection between two dots.
+        multiplicity(a, b): Returns how often two dots are connected.
+        by_count(): Returns the edges, most often used first.
+        from_steps(steps): Builds the graph of the dots of consecutive steps.
+    """
+
+    __slots__ = ("edges", "degree")
+
+    def __init__(self):
+        self.edges = {}
+        self.degree = array("I")
+
+    def __len__(self):
+        return len(self.edges)
+
+    def add(self, a, b):
+        key = (a, b) if a <= b else (b, a)
+        self.edges[key] = self.edges.get(key, 0) + 1
+        degree = self.degree
+        if key[1] >= len(degree):
+            degree.extend([0] * (key[1] + 1 - len(degree)))
+        degree[a] += 1
+        degree[b] += 1
+
+    def multiplicity(self, a, b):
+        return self.edges.get((a, b) if a <= b else (b, a), 0)
+
+    def by_count(self):
+        """Returns the ((a, b), count) edges, most often used first."""
+        return sorted(self.edges.items(), key=lambda edge: edge[1], reverse=True)
+
+    @classmethod
+    def from_steps(cls, steps):
+        graph = cls()
+        steps = iter(steps)
+        previous = next(steps, None)
+        for step in steps:
+            graph.add(previous, step)
+            previous = step
+        return graph
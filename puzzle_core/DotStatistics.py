@@ -0,0 +1,161 @@
+import math
+
+from .SpatialGrid import SpatialGrid
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, fall back to plain Python
+    np = None
+
+
+class DotStatistics:
+    """
+    Distance statistics over the coordinates of a dot mapping.
+
+    The coordinates of the mapping are held as two columns. When NumPy is
+    available the columns are arrays and every statistic is computed in batch;
+    otherwise the same statistics are computed with plain Python lists.
+
+    Args:
+        dots (iterable): The (x, y) coordinates of the dots.
+        use_numpy (bool, optional): Force the NumPy backend on or off. Defaults
+            to using NumPy whenever it can be imported.
+
+    Attributes:
+        use_numpy (bool): Whether the NumPy backend is used.
+        x (list or ndarray): The x-coordinates of the dots.
+        y (list or ndarray): The y-coordinates of the dots.
+
+    Methods:
+        step_distances(): Returns the distances between consecutive dots.
+        nearest(): Returns the nearest other dot and its distance for every dot.
+        summary(values): Returns the average, lowest and highest value.
+        histogram(values, num_bins): Returns the bin starts, counts and bin width.
+    """
+
+    # Rows per block in the pairwise nearest-neighbour search
+    chunk_size = 512
+    # Above this many dots the grid search beats the pairwise NumPy search
+    brute_force_limit = 2048
+
+    def __init__(self, dots, use_numpy=None):
+        self.use_numpy = np is not None and (use_numpy is None or use_numpy)
+        dots = list(dots)
+        x = [dot[0] for dot in dots]
+        y = [dot[1] for dot in dots]
+
+        if self.use_numpy:
+            self.x = np.asarray(x, dtype=float)
+            self.y = np.asarray(y, dtype=float)
+        else:
+            self.x = x
+            self.y = y
+
+    def __len__(self):
+        return len(self.x)
+
+    def step_distances(self):
+        """
+        Returns the distances between consecutive dots.
+
+        Returns:
+            list or ndarray: One distance less than the number of dots.
+        """
+        if self.use_numpy:
+            return np.hypot(np.diff(self.x), np.diff(self.y))
+
+        return [
+            math.hypot(self.x[i + 1] - self.x[i], self.y[i + 1] - self.y[i])
+            for i in range(len(self.x) - 1)
+        ]
+
+    def nearest(self):
+        """
+        Returns the nearest other dot and its distance for every dot.
+
+        Returns:
+            tuple: The index of the nearest dot and the distance to it, per dot.
+            Both are -1 and math.inf for a dot without any other dot. Small
+            sets are searched pairwise in NumPy, larger ones through a grid.
+        """
+        n = len(self.x)
+        if self.use_numpy and n <= self.brute_force_limit:
+            indices = np.full(n, -1, dtype=int)
+            distances = np.full(n, math.inf)
+            if n < 2:
+                return indices, distances
+            for start in range(0, n, self.chunk_size):
+                stop = min(start + self.chunk_size, n)
+                dx = self.x[start:stop, None] - self.x[None, :]
+                dy = self.y[start:stop, None] - self.y[None, :]
+                d_sq = dx * dx + dy * dy
+                rows = np.arange(stop - start)
+                d_sq[rows, rows + start] = math.inf
+                closest = np.argmin(d_sq, axis=1)
+                indices[start:stop] = closest
+                distances[start:stop] = np.sqrt(d_sq[rows, closest])
+            return indices, distances
+
+        indices = [-1] * n
+        distances = [math.inf] * n
+        grid = SpatialGrid(zip(self.x, self.y))
+        for i in range(n):
+            other, distance = grid.nearest(i)
+            if other is not None:
+                indices[i], distances[i] = other, distance
+        if self.use_numpy:
+            return np.asarray(indices), np.asarray(distances)
+        return indices, distances
+
+    def summary(self, values):
+        """
+        Returns the average, lowest and highest value.
+
+        Args:
+            values (list or ndarray): The values to summarize.
+
+        Returns:
+            tuple: The average, lowest and highest value, or zeros when empty.
+        """
+        if len(values) == 0:
+            return 0, 0, 0
+        if self.use_numpy:
+            values = np.asarray(values, dtype=float)
+            return float(values.mean()), float(values.min()), float(values.max())
+
+        return sum(values) / len(values), min(values), max(values)
+
+    def histogram(self, values, num_bins=10):
+        """
+        Returns equal-width bins between the lowest and highest value.
+
+        A value is counted in the bin where bin_start <= value < bin_end, and
+        the highest value in the last bin. Both backends bin with the same
+        floor division, so they give the same counts.
+
+        Args:
+            values (list or ndarray): The values to bin.
+            num_bins (int): The number of bins.
+
+        Returns:
+            tuple: A list of (bin_start, count) tuples and the bin width.
+        """
+        if len(values) == 0:
+            return [], 0
+        _, lowest, highest = self.summary(values)
+        bin_width = (highest - lowest) / num_bins
+        starts = [lowest + i * bin_width for i in range(num_bins)]
+
+        if bin_width == 0:
+            return [(starts[0], 0)], bin_width
+
+        if self.use_numpy:
+            values = np.asarray(values, dtype=float)
+            bins = ((values - lowest) // bin_width).astype(int)
+            counts = np.bincount(np.minimum(bins, num_bins - 1), minlength=num_bins)
+            return list(zip(starts, counts.tolist())), bin_width
+
+        counts = [0] * num_bins
+        for value in values:
+            counts[min(int((value - lowest) // bin_width), num_bins - 1)] += 1
+        return list(zip(starts, counts)), bin_width
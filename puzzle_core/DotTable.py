@@ -0,0 +1,150 @@
+from array import array
+
+from .ConnectionGraph import ConnectionGraph
+
+
+class DotTable:
+    """
+    The dots of a puzzle and the steps of its path, held as columns.
+
+    Every unique dot is one row of the dot columns, numbered from zero in
+    order of first appearance. The label of a dot is the codec encoding of
+    its label id, which is its row plus one; labels are only rendered to
+    strings when they are written out. Every node of the path is one row of
+    the step columns, which refer to their dot by its row, and every pair of
+    consecutive steps is counted in the connection graph as it is added.
+
+    Args:
+        codec (LabelCodec): The codec label ids are rendered with.
+
+    Attributes:
+        codec (LabelCodec): The codec label ids are rendered with.
+        x (array): The x-coordinate of every dot.
+        y (array): The y-coordinate of every dot.
+        has_collision (bytearray): Whether a dot is closer than the minimal
+            distance to its nearest neighbour.
+        distance (array): The distance of every dot to its nearest neighbour,
+            rounded to two decimals, or 0.0 without neighbours.
+        nearest (array): The row of the nearest neighbour of every dot, or -1.
+        step_dot (array): The dot of every step of the path.
+        step_number (array): The dot number of every step of the path.
+        connections (ConnectionGraph): The connections between the dots.
+
+    Methods:
+        add_dot(x, y): Appends a dot and returns its row.
+        add_step(dot, number): Appends a step of the path.
+        replace_steps(steps, start): Replaces the steps of the path.
+        label(dot): Returns the label of a dot.
+        step_labels(): Yields the label of every step.
+        coordinates(): Yields the (x, y) of every dot.
+        step_coordinates(steps): Yields the (x, y) of the dot of every step.
+        step_distances(): Returns the nearest-neighbour distance of every step.
+        steps_by_distance(): Returns the steps sorted by distance.
+        collision_count(): Returns the number of steps on colliding dots.
+        to_dict(): Returns the columns as JSON-serializable lists.
+        from_dict(data, codec): Rebuilds a table from to_dict.
+    """
+
+    __slots__ = (
+        "codec",
+        "x",
+        "y",
+        "has_collision",
+        "distance",
+        "nearest",
+        "step_dot",
+        "step_number",
+        "connections",
+    )
+
+    # Columns that are stored by to_dict, the graph is rebuilt from the steps
+    columns = (
+        "x",
+        "y",
+        "has_collision",
+        "distance",
+        "nearest",
+        "step_dot",
+        "step_number",
+    )
+
+    def __init__(self, codec):
+        self.codec = codec
+        self.x = array("i")
+        self.y = array("i")
+        self.has_collision = bytearray()
+        self.distance = array("d")
+        self.nearest = array("i")
+        self.step_dot = array("I")
+        self.step_number = array("i")
+        self.connections = ConnectionGraph()
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def step_count(self):
+        return len(self.step_dot)
+
+    def add_dot(self, x, y):
+        """Appends a dot without neighbours and returns its row."""
+        self.x.append(x)
+        self.y.append(y)
+        self.has_collision.append(0)
+        self.distance.append(0.0)
+        self.nearest.append(-1)
+        return len(self.x) - 1
+
+    def add_step(self, dot, number):
+        if self.step_dot:
+            self.connections.add(self.step_dot[-1], dot)
+        self.step_dot.append(dot)
+        self.step_number.append(number)
+
+    def replace_steps(self, steps, start=1):
+        """Replaces the steps of the path with dots numbered from start."""
+        self.step_dot = array("I")
+        self.step_number = array("i")
+        self.connections = ConnectionGraph()
+        for number, dot in enumerate(steps, start):
+            self.add_step(dot, number)
+
+    def label(self, dot):
+        return self.codec.encode(dot + 1)
+
+    def step_labels(self):
+        encode = self.codec.encode
+        return (encode(dot + 1) for dot in self.step_dot)
+
+    def coordinates(self):
+        return zip(self.x, self.y)
+
+    def step_coordinates(self, steps=None):
+        """Yields the (x, y) of the dot of the given steps, or of every step."""
+        dots = self.step_dot if steps is None else (self.step_dot[s] for s in steps)
+        x, y = self.x, self.y
+        return ((x[dot], y[dot]) for dot in dots)
+
+    def step_distances(self):
+        distance = self.distance
+        return [distance[dot] for dot in self.step_dot]
+
+    def steps_by_distance(self):
+        """Returns the steps sorted by distance, in path order among equals."""
+        distances = self.step_distances()
+        return sorted(range(len(distances)), key=distances.__getitem__)
+
+    def collision_count(self):
+        has_collision = self.has_collision
+        return sum(has_collision[dot] for dot in self.step_dot)
+
+    def to_dict(self):
+        return {name: list(getattr(self, name)) for name in self.columns}
+
+    @classmethod
+    def from_dict(cls, data, codec):
+        table = cls(codec)
+        for name in cls.columns:
+            getattr(table, name).extend(data[name])
+        table.connections = ConnectionGraph.from_steps(table.step_dot)
+        return table
@@ -0,0 +1,134 @@
+from functools import lru_cache
+from itertools import product
+
+
+class LabelCodec:
+    """
+    Encodes dot numbers as labels over an alphabet and back.
+
+    The digit tables of the alphabet are built once. When the label space is
+    small enough the complete forward and reverse label tables are built as
+    well, so encoding is a tuple index and decoding a dict lookup.
+
+    With variable_width the labels grow once the fixed-width space is used up:
+    the first len(alphabet) ** width numbers get width characters, the next
+    len(alphabet) ** (width + 1) numbers get one character more, and so on.
+    Numbering stays linear, so labels are still allocated in a single pass.
+
+    Args:
+        alphabet (str): The characters labels are made of, without repeats.
+        width (int): The number of characters per label, or the smallest
+            number of characters with variable_width.
+        variable_width (bool): Grow the labels beyond the fixed-width space.
+
+    Attributes:
+        alphabet (str): The characters labels are made of.
+        width (int): The (smallest) number of characters per label.
+        capacity (int): The number of labels of the smallest width,
+            len(alphabet) ** width.
+        variable_width (bool): Whether numbers beyond capacity are encoded.
+
+    Methods:
+        encode(number): Returns the label of a number.
+        decode(label): Returns the number of a label.
+        encode_range(start, stop): Returns the labels of range(start, stop).
+        decode_all(labels): Returns the numbers of the labels.
+    """
+
+    # Largest label space for which the complete label tables are built
+    table_limit = 1 << 18
+
+    def __init__(self, alphabet: str, width: int = 2, variable_width: bool = False):
+        if not alphabet or len(alphabet) < 2:
+            raise ValueError(
+                "Invalid alphabet. It should contain at least two characters."
+            )
+        if len(set(alphabet)) != len(alphabet):
+            raise ValueError("Invalid alphabet. It should not repeat characters.")
+        if width < 1:
+            raise ValueError("Invalid width. Labels need at least one character.")
+
+        self.alphabet = alphabet
+        self.width = width
+        self.variable_width = variable_width
+        self.base = len(alphabet)
+        self.capacity = self.base**width
+        self.digits = {letter: index for index, letter in enumerate(alphabet)}
+
+        self.labels = None
+        self.numbers = None
+        if self.capacity <= self.table_limit:
+            self.labels = tuple(
+                "".join(letters) for letters in product(alphabet, repeat=width)
+            )
+            self.numbers = {label: i + 1 for i, label in enumerate(self.labels)}
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def for_alphabet(cls, alphabet: str, width: int = 2, variable_width: bool = False):
+        """Returns the shared codec of an alphabet and width."""
+        return cls(alphabet, width, variable_width)
+
+    def check_number(self, number):
+        if number < 1 or (number > self.capacity and not self.variable_width):
+            raise ValueError(
+                f"Number {number} is out of range. Should be between 1 and {self.capacity}."
+            )
+
+    def width_of(self, number):
+        """Returns the label width of a number and its index within that width."""
+        width, index, size = self.width, number - 1, self.capacity
+        while index >= size:
+            index -= size
+            width += 1
+            size *= self.base
+        return width, index
+
+    def encode(self, number: int) -> str:
+        """Returns the label of a number."""
+        self.check_number(number)
+        if self.labels is not None and number <= self.capacity:
+            return self.labels[number - 1]
+
+        width, rest = self.width_of(number)
+        letters = []
+        for _ in range(width):
+            rest, index = divmod(rest, self.base)
+            letters.append(self.alphabet[index])
+        return "".join(reversed(letters))
+
+    def decode(self, label: str) -> int:
+        """Returns the number of a label."""
+        if self.numbers is not None:
+            number = self.numbers.get(label)
+            if number is not None:
+                return number
+
+        width = len(label)
+        if (
+            width < self.width
+            or (width > self.width and not self.variable_width)
+            or any(c not in self.digits for c in label)
+        ):
+            raise ValueError(f"Invalid label {label!r}.")
+
+        # Skip the numbers of all shorter labels
+        offset = sum(self.base**w for w in range(self.width, width))
+        index = 0
+        for letter in label:
+            index = index * self.base + self.digits[letter]
+        return offset + index + 1
+
+    def encode_range(self, start: int, stop: int) -> list:
+        """Returns the labels of the numbers in range(start, stop)."""
+        if stop <= start:
+            return []
+        self.check_number(start)
+        self.check_number(stop - 1)
+        if self.labels is not None and stop - 1 <= self.capacity:
+            return list(self.labels[start - 1 : stop - 1])
+        return [self.encode(number) for number in range(start, stop)]
+
+    def decode_all(self, labels) -> list:
+        """Returns the numbers of the labels."""
+        return [self.decode(label) for label in labels]
@@ -0,0 +1,273 @@
+class PointsAggregator:
+    """
+    A class that finds the neighbors of given points within a specified radius.
+
+    Points are bucketed in a grid with cells the size of the radius, so the
+    neighbors of a point are always in the 3x3 cells around it.
+
+    Args:
+        points (list): A list of (x, y) coordinates representing the points.
+        r (float): The radius within which to search for neighbors.
+
+    Attributes:
+        points (list): A list of (x, y) coordinates representing the points.
+        r (float): The radius within which to search for neighbors.
+        grid_map (dict): A dictionary that maps grid keys to a list of point indices.
+        stats (dict): The point counts of the last evaluation, for reporting.
+
+    Methods:
+        query(qx, qy): Returns the neighbors of a given point (qx, qy).
+        evaluate_points(): Evaluates the points and returns their averaged coordinates.
+        cluster_points(): Collapses clusters of neighbors into single points.
+        converge(mode, max_iterations, tolerance): Repeats a pass until stable.
+    """
+
+    def __init__(self, points, radius: int):
+        self.points = list(points)
+        self.radius = radius
+        # The indices of the points still on the path, in path order
+        self.order = list(range(len(self.points)))
+        self.stats = {}
+        self.grid_map = {}
+        for index, (x, y) in enumerate(self.points):
+            self.grid_map.setdefault(self.cell_key(x, y), []).append(index)
+
+    def cell_key(self, x, y):
+        return (x // self.radius, y // self.radius)
+
+    def remove_from_cell(self, key, index):
+        cell = self.grid_map[key]
+        cell.remove(index)
+        if not cell:
+            # Drop emptied cells so the grid only holds occupied cells
+            del self.grid_map[key]
+
+    def current_points(self):
+        """Returns the points still on the path, in path order."""
+        return [self.points[index] for index in self.order]
+
+    def neighbor_indices(self, qx, qy):
+        """Yields the indices of all points within the radius of (qx, qy)."""
+        sx, sy = self.cell_key(qx, qy)
+        radius_sq = self.radius**2
+        for i in [-1, 0, 1]:
+            for j in [-1, 0, 1]:
+                # A plain get, so querying empty cells does not grow the grid
+                for index in self.grid_map.get((sx + i, sy + j), ()):
+                    x, y = self.points[index]
+                    if (qx - x) ** 2 + (qy - y) ** 2 <= radius_sq:
+                        yield index
+
+    def query(self, qx, qy):
+        """
+        Returns the neighbors of a given point (qx, qy).
+
+        Args:
+            qx (float): The x-coordinate of the query point.
+            qy (float): The y-coordinate of the query point.
+
+        Returns:
+            list: A list of (x, y) coordinates representing the neighbors.
+        """
+        neighbors = []
+        for index in self.neighbor_indices(qx, qy):
+            x, y = self.points[index]
+            if (x, y) != (qx, qy):
+                neighbors.append((x, y))
+
+        return neighbors
+
+    def average_pass(self):
+        """
+        Averages every point with its neighbors, dropping repeated points.
+
+        Returns:
+            list: (index, (x, y)) per point in path order, with None instead of
+            the coordinates for a point that is dropped.
+        """
+        updates = []
+        for position, index in enumerate(self.order):
+            point = self.points[index]
+            next_index = (
+                self.order[position + 1] if position + 1 < len(self.order) else None
+            )
+            if next_index is not None and point == self.points[next_index]:
+                updates.append((index, None))
+                continue
+            neighbors = self.query(*point)
+            if neighbors:
+                # Compute the average coordinates of the point and its neighbors
+                avg_x = (point[0] + sum(n[0] for n in neighbors)) / (len(neighbors) + 1)
+                avg_y = (point[1] + sum(n[1] for n in neighbors)) / (len(neighbors) + 1)
+                updates.append((index, (avg_x, avg_y)))
+            else:
+                updates.append((index, point))
+        return updates
+
+    def evaluate_points(self):
+        """
+        Evaluates the points and returns their averaged coordinates.
+
+        Returns:
+            list: A list of (x, y) coordinates representing the averaged points.
+        """
+        updates = self.average_pass()
+        averaged_points = [point for _, point in updates if point is not None]
+        duplicates_merged = len(averaged_points) < len(updates)
+        neighbors_merged = any(
+            point is not None and point != self.points[index]
+            for index, point in updates
+        )
+
+        self.stats = {
+            "original_points": len(self.order),
+            "new_points": len(averaged_points),
+            "neighbors_merged": neighbors_merged,
+            "duplicates_merged": duplicates_merged,
+        }
+
+        return averaged_points, (neighbors_merged or duplicates_merged)
+
+    def cluster_pass(self):
+        """
+        Replaces every point by the average of its cluster of neighbors.
+
+        Points within the radius of each other are joined into clusters with a
+        union-find, so a chain of close points ends up in one cluster. The path
+        order is kept by walking the points in order and emitting the average
+        of each point's cluster, dropping repeats of the previous cluster.
+
+        Returns:
+            tuple: (index, (x, y)) per point in path order, with None instead
+            of the coordinates for a dropped point, and the number of clusters.
+        """
+        parent = {index: index for index in self.order}
+
+        def find(index):
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]  # Path halving
+                index = parent[index]
+            return index
+
+        for index in self.order:
+            for other in self.neighbor_indices(*self.points[index]):
+                if other > index:
+                    root, other_root = find(index), find(other)
+                    if root != other_root:
+                        parent[other_root] = root
+
+        # Sum the coordinates of every cluster
+        sums = {}
+        for index in self.order:
+            x, y = self.points[index]
+            root = find(index)
+            sx, sy, count = sums.get(root, (0, 0, 0))
+            sums[root] = (sx + x, sy + y, count + 1)
+
+        updates = []
+        previous_root = None
+        for index in self.order:
+            root = find(index)
+            if root == previous_root:
+                updates.append((index, None))
+                continue
+            sx, sy, count = sums[root]
+            updates.append((index, (sx / count, sy / count)))
+            previous_root = root
+
+        return updates, len(sums)
+
+    def cluster_points(self):
+        """
+        Collapses every cluster of neighboring points into a single point.
+
+        Returns:
+            tuple: A list of (x, y) coordinates and the number of points that
+            were dropped. A cluster the path passes through more than once
+            keeps a point for every pass, so this can be less than the points
+            minus the clusters.
+        """
+        updates, clusters = self.cluster_pass()
+        clustered_points = [point for _, point in updates if point is not None]
+
+        merged = len(self.order) - len(clustered_points)
+        self.stats = {
+            "original_points": len(self.order),
+            "new_points": len(clustered_points),
+            "clusters": clusters,
+            "points_merged": merged,
+        }
+
+        return clustered_points, merged
+
+    def apply(self, updates):
+        """
+        Applies the result of a pass, moving only the changed points in the grid.
+
+        Args:
+            updates (list): (index, (x, y) or None) per point, as returned by a pass.
+
+        Returns:
+            tuple: The number of merged points, being the points that were
+            dropped or moved, and the largest distance a point moved.
+        """
+        merged = 0
+        displacement = 0.0
+        for index, point in updates:
+            old = self.points[index]
+            if point == old:
+                continue
+            merged += 1
+            old_key = self.cell_key(*old)
+            if point is None:
+                self.remove_from_cell(old_key, index)
+                self.points[index] = None
+                continue
+            displacement = max(
+                displacement,
+                ((point[0] - old[0]) ** 2 + (point[1] - old[1]) ** 2) ** 0.5,
+            )
+            new_key = self.cell_key(*point)
+            if new_key != old_key:
+                self.remove_from_cell(old_key, index)
+                self.grid_map.setdefault(new_key, []).append(index)
+            self.points[index] = point
+
+        self.order = [index for index, point in updates if point is not None]
+        return merged, displacement
+
+    def converge(self, mode="average", max_iterations=10, tolerance=0.0):
+        """
+        Repeats an aggregation pass in memory until the points are stable.
+
+        The grid is kept between passes and only updated for the points that
+        moved or were dropped. Passes stop once a pass merges nothing, once
+        no point moves more than the tolerance, or after max_iterations.
+
+        Args:
+            mode (str): "average" or "cluster", the pass to repeat.
+            max_iterations (int): The maximal number of passes.
+            tolerance (float): The displacement below which the points are stable.
+
+        Returns:
+            tuple: A list of (x, y) coordinates and the (merged, displacement,
+            points left) of every pass.
+        """
+        original_points = len(self.order)
+        passes = []
+        for _ in range(max_iterations):
+            if mode == "cluster":
+                updates, _ = self.cluster_pass()
+            else:
+                updates = self.average_pass()
+            merged, displacement = self.apply(updates)
+            passes.append((merged, displacement, len(self.order)))
+            if merged == 0 or displacement <= tolerance:
+                break
+
+        self.stats = {
+            "original_points": original_points,
+            "new_points": len(self.order),
+            "passes": len(passes),
+        }
+        return self.current_points(), passes
@@ -0,0 +1,190 @@
+import heapq
+import math
+
+
+class PreparedPolygon:
+    """
+    A closed polygon prepared once for repeated containment queries.
+
+    The rings are flattened into a list of non-horizontal edges which are
+    sorted into horizontal bands of a y-sorted edge table. A containment query
+    only visits the edges of the band the query point falls in.
+
+    Args:
+        rings (list): A list of rings, each a list of (x, y) vertices. Every
+            ring is implicitly closed from its last vertex back to its first.
+
+    Attributes:
+        edges (list): (y_min, y_max, x1, y1, dx_dy) tuples per edge, by y_min.
+        bounding_box (tuple): The (x_min, y_min, x_max, y_max) of all vertices.
+        bands (list): The indices into edges overlapping each horizontal band.
+
+    Methods:
+        contains(x, y): Returns whether the point is inside the polygon.
+        has_clearance(x, y, clearance): Returns whether a point and its
+            surrounding points at the clearance are all inside the polygon.
+        distance_to_boundary(x, y): Returns the signed distance to the outline.
+        pole_of_inaccessibility(precision): Returns the inside point farthest
+            from the outline and its distance to the outline.
+    """
+
+    def __init__(self, rings):
+        self.rings = [list(ring) for ring in rings if len(ring) > 1]
+        self.edges = []
+        self.segments = []
+        xs, ys = [], []
+        for ring in self.rings:
+            for i, (x1, y1) in enumerate(ring):
+                x2, y2 = ring[(i + 1) % len(ring)]  # Wrap around for the last point
+                xs.append(x1)
+                ys.append(y1)
+                if (x1, y1) != (x2, y2):
+                    self.segments.append((x1, y1, x2, y2))
+                if y1 == y2:
+                    continue  # Horizontal edges never cross a horizontal ray
+                self.edges.append(
+                    (min(y1, y2), max(y1, y2), x1, y1, (x2 - x1) / (y2 - y1))
+                )
+        self.edges.sort()
+
+        if not xs:
+            self.bounding_box = (0.0, 0.0, 0.0, 0.0)
+            self.bands = []
+            return
+        self.bounding_box = (min(xs), min(ys), max(xs), max(ys))
+
+        # Aim for a handful of edges per band
+        _, y_min, _, y_max = self.bounding_box
+        self.band_count = max(1, len(self.edges) // 4)
+        self.band_height = (y_max - y_min) / self.band_count or 1.0
+        self.bands = [[] for _ in range(self.band_count)]
+        for index, (e_min, e_max, _, _, _) in enumerate(self.edges):
+            for band in range(self.band_of(e_min), self.band_of(e_max) + 1):
+                self.bands[band].append(index)
+
+    def band_of(self, y):
+        band = int((y - self.bounding_box[1]) // self.band_height)
+        return min(max(band, 0), self.band_count - 1)
+
+    def contains(self, x, y):
+        """
+        Returns whether the point is inside the polygon by the even-odd rule.
+
+        Args:
+            x (float): The x-coordinate of the point.
+            y (float): The y-coordinate of the point.
+
+        Returns:
+            bool: True if the point is inside the polygon.
+        """
+        x_min, y_min, x_max, y_max = self.bounding_box
+        if not self.bands or not (x_min <= x <= x_max and y_min <= y <= y_max):
+            return False
+
+        num_crossings = 0
+        for index in self.bands[self.band_of(y)]:
+            e_min, e_max, x1, y1, dx_dy = self.edges[index]
+            if e_min < y <= e_max and x1 + (y - y1) * dx_dy < x:
+                num_crossings += 1
+
+        # Check if the number of crossings is odd
+        return num_crossings % 2 == 1
+
+    def has_clearance(self, x, y, clearance):
+        """
+        Returns whether the point and the eight points around it at the
+        clearance are all inside the polygon.
+        """
+        return all(
+            self.contains(x + i * clearance, y + j * clearance)
+            for i in [-1, 0, 1]
+            for j in [-1, 0, 1]
+        )
+
+    def distance_to_boundary(self, x, y):
+        """
+        Returns the distance from the point to the nearest edge, positive when
+        the point is inside the polygon and negative when it is outside.
+        """
+        best_sq = math.inf
+        for x1, y1, x2, y2 in self.segments:
+            dx, dy = x2 - x1, y2 - y1
+            t = ((x - x1) * dx + (y - y1) * dy) / (dx * dx + dy * dy)
+            t = min(max(t, 0.0), 1.0)
+            px, py = x1 + t * dx - x, y1 + t * dy - y
+            best_sq = min(best_sq, px * px + py * py)
+
+        distance = math.sqrt(best_sq)
+        return distance if self.contains(x, y) else -distance
+
+    def area_centroid(self):
+        """Returns the area-weighted centroid, or the bounding box center."""
+        area = cx = cy = 0.0
+        for ring in self.rings:
+            for i, (x1, y1) in enumerate(ring):
+                x2, y2 = ring[(i + 1) % len(ring)]
+                cross = x1 * y2 - x2 * y1
+                area += cross
+                cx += (x1 + x2) * cross
+                cy += (y1 + y2) * cross
+        if area == 0:
+            x_min, y_min, x_max, y_max = self.bounding_box
+            return (x_min + x_max) / 2, (y_min + y_max) / 2
+        return cx / (3 * area), cy / (3 * area)
+
+    def pole_of_inaccessibility(self, precision=1.0):
+        """
+        Returns the point inside the polygon farthest from its outline.
+
+        The bounding box is covered with square cells which are searched
+        best-first by the largest distance any point in the cell could have.
+        Cells that cannot improve on the best point by more than the precision
+        are dropped, the others are split into four.
+
+        Args:
+            precision (float): The tolerance on the returned distance.
+
+        Returns:
+            tuple: The x- and y-coordinate of the point and its distance to the
+            outline, which is negative when the polygon has no inside at all.
+        """
+        x_min, y_min, x_max, y_max = self.bounding_box
+        width, height = x_max - x_min, y_max - y_min
+        cell_size = min(width, height)
+        if cell_size == 0:
+            return x_min, y_min, 0.0
+
+        def make_cell(x, y, h):
+            d = self.distance_to_boundary(x, y)
+            # The largest distance any point of the cell could have
+            return (-(d + h * math.sqrt(2)), x, y, h, d)
+
+        cells = []
+        h = cell_size / 2
+        x = x_min
+        while x < x_max:
+            y = y_min
+            while y < y_max:
+                heapq.heappush(cells, make_cell(x + h, y + h, h))
+                y += cell_size
+            x += cell_size
+
+        best = make_cell(*self.area_centroid(), 0)
+        center = make_cell(x_min + width / 2, y_min + height / 2, 0)
+        if center[4] > best[4]:
+            best = center
+
+        while cells:
+            cell = heapq.heappop(cells)
+            _, x, y, h, d = cell
+            if d > best[4]:
+                best = cell
+            if -cell[0] - best[4] <= precision:
+                continue
+            h /= 2
+            for dx in (-h, h):
+                for dy in (-h, h):
+                    heapq.heappush(cells, make_cell(x + dx, y + dy, h))
+
+        _, x, y, _, d = best
+        return x, y, d
@@ -0,0 +1,69 @@
+class SequenceLayout:
+    """
+    Breaks a sequence of words into fixed-width lines and pages of lines.
+
+    The layout assumes a monospace font, so the number of characters that fit
+    on a line follows from the font size alone. Lines are produced one at a
+    time, so a sequence of any length is laid out without building it as a
+    single string first.
+
+    Args:
+        width (float): The width of the text area in user units.
+        height (float): The height of the text area in user units.
+        font_size (float): The font size in user units.
+
+    Attributes:
+        columns (int): The number of characters per line.
+        rows (int): The number of lines per page.
+        line_height (float): The distance between baselines in user units.
+
+    Methods:
+        lines(words): Yields the lines of (word, separator) pairs.
+        pages(words): Yields the pages as lists of lines.
+    """
+
+    # Advance width of a Consolas glyph, as a fraction of the font size
+    char_width = 0.55
+    # Distance between baselines, as a fraction of the font size
+    line_spacing = 1.25
+
+    def __init__(self, width, height, font_size):
+        self.font_size = font_size
+        self.line_height = font_size * self.line_spacing
+        self.columns = max(int(width // (font_size * self.char_width)), 1)
+        self.rows = max(int(height // self.line_height), 1)
+
+    def lines(self, words):
+        """
+        Yields the lines of a sequence of (word, separator) pairs.
+
+        A separator follows its word and is dropped at the end of a line. A
+        word longer than a line gets a line of its own.
+        """
+        parts = []
+        length = 0
+        separator = ""
+        for word, next_separator in words:
+            if parts and length + len(separator) + len(word) > self.columns:
+                yield "".join(parts)
+                parts.clear()
+                length = 0
+            if parts:
+                parts.append(separator)
+                length += len(separator)
+            parts.append(word)
+            length += len(word)
+            separator = next_separator
+        if parts:
+            yield "".join(parts)
+
+    def pages(self, words):
+        """Yields the lines of a sequence grouped in pages of rows lines."""
+        page = []
+        for line in self.lines(words):
+            page.append(line)
+            if len(page) == self.rows:
+                yield page
+                page = []
+        if page:
+            yield page
@@ -0,0 +1,190 @@
+import math
+
+
+class SpatialGrid:
+    """
+    A uniform grid over a set of points for fast neighbour queries.
+
+    The grid is built once and then answers nearest-neighbour and fixed-radius
+    queries by only visiting the cells around the query point, which keeps the
+    work per query roughly constant for the point densities found in puzzles.
+    A point can be moved, which only updates the cells it leaves and enters.
+
+    Args:
+        points (list): A list of (x, y) coordinates.
+        cell_size (float, optional): The edge length of a grid cell. When
+            omitted it is derived from the point density of the bounding box.
+
+    Attributes:
+        points (list): The indexed (x, y) coordinates.
+        cell_size (float): The edge length of a grid cell.
+        cells (dict): Maps grid keys to a list of point indices.
+
+    Methods:
+        nearest(index): Returns the nearest other point of an indexed point.
+        pairs_within(radius): Returns all point pairs closer than the radius.
+        within(index, radius): Returns the points closer than the radius to a point.
+        move(index, x, y): Moves an indexed point.
+    """
+
+    def __init__(self, points, cell_size=None):
+        self.points = list(points)
+        self.cell_size = cell_size or self.estimate_cell_size(self.points)
+        self.cells = {}
+        for index, (x, y) in enumerate(self.points):
+            self.cells.setdefault(self.cell_key(x, y), []).append(index)
+
+        # The ring search never has to look further than the grid extent
+        keys = self.cells.keys()
+        if keys:
+            self.extent = [
+                min(k[0] for k in keys),
+                min(k[1] for k in keys),
+                max(k[0] for k in keys),
+                max(k[1] for k in keys),
+            ]
+            self.update_max_ring()
+        else:
+            self.extent = None
+            self.max_ring = 0
+
+    def update_max_ring(self):
+        min_x, min_y, max_x, max_y = self.extent
+        self.max_ring = max(max_x - min_x, max_y - min_y) + 1
+
+    @staticmethod
+    def estimate_cell_size(points):
+        """Pick a cell size that puts about one point in each cell."""
+        if len(points) < 2:
+            return 1.0
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        area = (max(xs) - min(xs)) * (max(ys) - min(ys))
+        return max(math.sqrt(area / len(points)), 1.0)
+
+    def cell_key(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def ring(self, cx, cy, r):
+        """Yield the cell keys at Chebyshev distance r from (cx, cy)."""
+        if r == 0:
+            yield (cx, cy)
+            return
+        for i in range(-r, r + 1):
+            yield (cx + i, cy - r)
+            yield (cx + i, cy + r)
+        for j in range(-r + 1, r):
+            yield (cx - r, cy + j)
+            yield (cx + r, cy + j)
+
+    def nearest(self, index):
+        """
+        Returns the nearest other point of the point at the given index.
+
+        Args:
+            index (int): The index of the query point.
+
+        Returns:
+            tuple: The index of the nearest point and its distance, or
+            (None, math.inf) when there is no other point.
+        """
+        qx, qy = self.points[index]
+        cx, cy = self.cell_key(qx, qy)
+        best_index, best_sq = None, math.inf
+
+        for r in range(self.max_ring + 1):
+            for key in self.ring(cx, cy, r):
+                for other in self.cells.get(key, ()):
+                    if other == index:
+                        continue
+                    ox, oy = self.points[other]
+                    d_sq = (qx - ox) ** 2 + (qy - oy) ** 2
+                    if d_sq < best_sq:
+                        best_index, best_sq = other, d_sq
+            # Cells beyond this ring are at least r cells away from the query
+            if best_sq <= (r * self.cell_size) ** 2:
+                break
+
+        return best_index, math.sqrt(best_sq)
+
+    def pairs_within(self, radius):
+        """
+        Returns all point pairs that are at most the radius apart.
+
+        Args:
+            radius (float): The maximal distance between the points of a pair.
+
+        Returns:
+            list: A list of (i, j, distance) tuples with i < j.
+        """
+        pairs = []
+        reach = int(math.ceil(radius / self.cell_size))
+        radius_sq = radius**2
+        for (cx, cy), members in self.cells.items():
+            for i in range(-reach, reach + 1):
+                for j in range(-reach, reach + 1):
+                    others = self.cells.get((cx + i, cy + j))
+                    if not others:
+                        continue
+                    for a in members:
+                        ax, ay = self.points[a]
+                        for b in others:
+                            if b <= a:
+                                continue
+                            bx, by = self.points[b]
+                            d_sq = (ax - bx) ** 2 + (ay - by) ** 2
+                            if d_sq <= radius_sq:
+                                pairs.append((a, b, math.sqrt(d_sq)))
+        return pairs
+
+    def within(self, index, radius):
+        """
+        Returns the other points that are at most the radius from a point.
+
+        Args:
+            index (int): The index of the query point.
+            radius (float): The maximal distance to the query point.
+
+        Returns:
+            list: A list of (index, distance) tuples.
+        """
+        qx, qy = self.points[index]
+        cx, cy = self.cell_key(qx, qy)
+        reach = int(math.ceil(radius / self.cell_size))
+        radius_sq = radius**2
+        found = []
+        for i in range(-reach, reach + 1):
+            for j in range(-reach, reach + 1):
+                for other in self.cells.get((cx + i, cy + j), ()):
+                    if other == index:
+                        continue
+                    ox, oy = self.points[other]
+                    d_sq = (qx - ox) ** 2 + (qy - oy) ** 2
+                    if d_sq <= radius_sq:
+                        found.append((other, math.sqrt(d_sq)))
+        return found
+
+    def move(self, index, x, y):
+        """Moves the point at the given index, updating only the cells it crosses."""
+        old_key = self.cell_key(*self.points[index])
+        new_key = self.cell_key(x, y)
+        self.points[index] = (x, y)
+        if new_key == old_key:
+            return
+
+        members = self.cells[old_key]
+        members.remove(index)
+        if not members:
+            del self.cells[old_key]
+        self.cells.setdefault(new_key, []).append(index)
+
+        extent = self.extent
+        if not (
+            extent[0] <= new_key[0] <= extent[2]
+            and extent[1] <= new_key[1] <= extent[3]
+        ):
+            extent[0] = min(extent[0], new_key[0])
+            extent[1] = min(extent[1], new_key[1])
+            extent[2] = max(extent[2], new_key[0])
+            extent[3] = max(extent[3], new_key[1])
+            self.update_max_ring()
@@ -0,0 +1,49 @@
+"""Geometry core of the puzzle extensions.
+
+Everything in this package works on plain coordinates, lists and columns and
+does not import inkex, so it can be used and timed outside Inkscape. The
+extensions convert their SVG elements to plain data and call into it.
+"""
+
+from . import mapping, placement, relaxation, route
+from .ConnectionGraph import ConnectionGraph
+from .DotStatistics import DotStatistics
+from .DotTable import DotTable
+from .LabelCodec import LabelCodec
+from .mapping import check_density, create_mapping, evaluate_distances
+from .placement import (
+    adjust_position_in_grid,
+    calculate_centroid,
+    place_in_grid,
+    place_polylabel,
+)
+from .PointsAggregator import PointsAggregator
+from .PreparedPolygon import PreparedPolygon
+from .relaxation import relax_dots
+from .route import optimize_route
+from .SequenceLayout import SequenceLayout
+from .SpatialGrid import SpatialGrid
+
+__all__ = [
+    "ConnectionGraph",
+    "DotStatistics",
+    "DotTable",
+    "LabelCodec",
+    "PointsAggregator",
+    "PreparedPolygon",
+    "SequenceLayout",
+    "SpatialGrid",
+    "adjust_position_in_grid",
+    "calculate_centroid",
+    "check_density",
+    "create_mapping",
+    "evaluate_distances",
+    "mapping",
+    "optimize_route",
+    "place_in_grid",
+    "place_polylabel",
+    "placement",
+    "relax_dots",
+    "relaxation",
+    "route",
+]
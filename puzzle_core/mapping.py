@@ -0,0 +1,75 @@
+"""Dot mappings of a puzzle path, as a table of columns."""
+
+from .DotStatistics import DotStatistics
+from .DotTable import DotTable
+from .SpatialGrid import SpatialGrid
+
+
+def create_mapping(points, codec, start=1):
+    """Create the table of dots and steps of the path's end points
+
+    Every point is rounded to a dot; dots are numbered in order of first
+    appearance and labelled with the codec when they are written out.
+
+    Args:
+        points (iterable): The (x, y) end points of the path, in path order.
+        codec (LabelCodec): The codec labels are encoded with.
+        start (int): The dot number of the first point.
+
+    Returns:
+        DotTable: The unique dots and one step per point.
+    """
+    dots = DotTable(codec)
+    coord_to_dot = {}  # Dictionary for efficient coordinate lookup
+    dot_number = start - 1
+    previous_point = None
+
+    for x, y in points:
+        current_point = (round(x), round(y))
+
+        dot = coord_to_dot.get(current_point)
+        if dot is None:
+            # New coordinate, add a new dot and store it
+            dot = coord_to_dot[current_point] = dots.add_dot(*current_point)
+
+        # Increment the dot number if the current point is different from the previous point
+        if current_point != previous_point:
+            dot_number += 1
+
+        dots.add_step(dot, dot_number)
+
+    return dots
+
+
+def check_density(dots, minimal_distance):
+    """Find the nearest neighbour of every dot and the colliding pairs
+
+    The distance, nearest and has_collision columns of the table are set in
+    place.
+
+    Returns:
+        list: The (dot, dot, distance) pairs closer than minimal_distance.
+    """
+    coords = list(dots.coordinates())
+    indices, distances = DotStatistics(coords).nearest()
+    for dot, (other, distance) in enumerate(zip(indices, distances)):
+        if other < 0:
+            dots.nearest[dot] = -1
+            dots.distance[dot] = 0.0
+            dots.has_collision[dot] = False
+        else:
+            distance = round(float(distance), 2)
+            dots.nearest[dot] = int(other)
+            dots.distance[dot] = distance
+            dots.has_collision[dot] = distance <= minimal_distance
+
+    grid = SpatialGrid(coords)
+    return [
+        (a, b, round(distance, 2))
+        for a, b, distance in grid.pairs_within(minimal_distance)
+    ]
+
+
+def evaluate_distances(distances):
+    """Return the average, lowest and highest nearest-neighbour distance"""
+    return DotStatistics(()).summary(distances)
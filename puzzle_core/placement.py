@@ -0,0 +1,106 @@
+"""Placement of the centroid marker of a plane, on plain coordinates."""
+
+
+def calculate_centroid(endpoints):
+    """Return the average of the end points, or (None, None) without points"""
+    x_coords = []
+    y_coords = []
+    for x, y in endpoints:
+        x_coords.append(x)
+        y_coords.append(y)
+
+    if not x_coords or not y_coords:
+        return None, None
+    centroid_x = sum(x_coords) / len(x_coords)
+    centroid_y = sum(y_coords) / len(y_coords)
+    return centroid_x, centroid_y
+
+
+def is_placeable(x, y, polygon, clearance):
+    """Check that a point is inside the polygon with clearance around it"""
+    return polygon.has_clearance(x, y, clearance) and polygon.contains(x, y)
+
+
+def adjust_position_in_grid(x, y, bounding_box, polygon, clearance, fraction):
+    """Adjust the position within a grid pattern around the bounding box center.
+
+    Args:
+        x (float): The x-coordinate of the bounding box center.
+        y (float): The y-coordinate of the bounding box center.
+        bounding_box (tuple): The (width, height) of the plane.
+        polygon (PreparedPolygon): The plane.
+        clearance (float): The clearance needed around the position.
+        fraction (int): The bounding box is searched in steps of 1 / fraction.
+
+    Returns:
+        tuple: The position and whether it is inside the plane.
+    """
+    width, height = bounding_box
+    # Define the step sizes for grid search
+    step_size_x = width / fraction
+    step_size_y = height / fraction
+
+    # Define the range of positions to check around the center
+    search_range = range(-5, 6)
+
+    # Iterate over a grid of positions around the bounding box center
+    for dx in search_range:
+        for dy in search_range:
+            # Calculate the new position
+            new_x = x + dx * step_size_x
+            new_y = y + dy * step_size_y
+
+            # Check if the new position is inside the path
+            # and if points around the new position have clearance
+            if polygon.contains(new_x, new_y) and polygon.has_clearance(
+                new_x, new_y, clearance
+            ):
+                # If yes, update the position and stop searching
+                return new_x, new_y, True
+
+    # If no suitable position found, return the original position
+    return x, y, False
+
+
+def place_in_grid(endpoints, bounding_box, polygon, clearance, fraction):
+    """Try the vertex average, the bounding box center and then a grid.
+
+    Args:
+        endpoints (iterable): The (x, y) end points of the plane's path.
+        bounding_box (tuple): The (left, top, width, height) of the plane.
+        polygon (PreparedPolygon): The plane.
+        clearance (float): The clearance needed around the position.
+        fraction (int): The bounding box is searched in steps of 1 / fraction.
+
+    Returns:
+        tuple: The position and whether it is inside the plane.
+    """
+    x, y = calculate_centroid(endpoints)
+    inside = x is not None and is_placeable(x, y, polygon, clearance)
+
+    if not inside:
+        # Use the bounding box center as the initial position
+        left, top, width, height = bounding_box
+        x, y = left + width / 2, top + height / 2
+
+        # Check if the initial position is inside the path
+        inside = is_placeable(x, y, polygon, clearance)
+
+        # If not, adjust the position within a grid pattern
+        if not inside:
+            x, y, inside = adjust_position_in_grid(
+                x, y, (width, height), polygon, clearance, fraction
+            )
+
+    return x, y, inside
+
+
+def place_polylabel(polygon, clearance, precision=0.5):
+    """Place at the point farthest from the outline of the plane.
+
+    Returns:
+        tuple: The position, whether it has the clearance and its distance
+        to the outline.
+    """
+    x, y, distance = polygon.pole_of_inaccessibility(precision)
+    return x, y, distance >= clearance, distance
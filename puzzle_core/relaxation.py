@@ -0,0 +1,147 @@
+"""Relaxation of colliding dots, nudging them apart on plain coordinates."""
+
+import math
+
+from .SpatialGrid import SpatialGrid
+
+# The dots are pushed this much further apart than the minimal distance, so
+# rounding them to whole coordinates does not bring them back within it
+rounding_margin = 1.5
+# A dot that would move less than this has settled and is left in place
+settle_distance = 0.05
+# The fractions of its push a dot may keep when it is rounded, the first that
+# does not crowd a neighbour is used
+settle_fractions = (1.0, 0.75, 0.5, 0.25, 0.0)
+
+
+def crowds(grid, origin, dot, minimal_distance):
+    """Whether a dot collides with a neighbour it is closer to than it started"""
+    ox, oy = origin[dot]
+    for other, distance in grid.within(dot, minimal_distance):
+        start = math.hypot(ox - origin[other][0], oy - origin[other][1])
+        if not distance or distance < start:
+            return True
+    return False
+
+
+def relax_dots(dots, minimal_distance, max_displacement, max_iterations=50):
+    """Nudge colliding dots apart until they respect the minimal distance
+
+    Every iteration pushes each pair of dots closer than the target distance
+    apart along the line through them, each dot by half the overlap. The pushes
+    on a dot are summed and the dot is kept within max_displacement of where
+    it started, so the drawing keeps its shape. A dot that reaches that bound
+    is pinned, and its neighbours take the whole overlap. Only the dots that
+    moved are checked in the next iteration, and only the cells of the spatial
+    grid they leave and enter are updated. Relaxation stops as soon as no dots
+    collide, or once every dot has settled.
+
+    The x and y columns of the table are then rounded to the relaxed positions
+    in place. A dot that would still collide with a neighbour it is closer to
+    than it started, or land on top of it, keeps only part of its push, down
+    to none, so relaxing never makes a collision worse. Rounding towards where
+    the dot started keeps it within max_displacement; check_density reports
+    the collisions that remain.
+
+    Args:
+        dots (DotTable): The dots to relax.
+        minimal_distance (float): The distance at which dots collide.
+        max_displacement (float): How far a dot may move from where it started.
+        max_iterations (int): The iterations after which relaxation stops.
+
+    Returns:
+        tuple: The number of iterations and the set of rows of the moved dots.
+    """
+    target = minimal_distance + rounding_margin
+    origin = list(dots.coordinates())
+    grid = SpatialGrid(origin, cell_size=target)
+    colliding = {
+        dot for pair in grid.pairs_within(minimal_distance) for dot in pair[:2]
+    }
+    active = set(colliding)
+    moved = set()
+    pinned = set()
+    iterations = 0
+
+    while active and colliding and iterations < max_iterations:
+        iterations += 1
+        pushes = {}
+        for a in active:
+            ax, ay = grid.points[a]
+            for b, distance in grid.within(a, target):
+                if distance >= target or (b in active and b < a):
+                    continue  # Far enough apart, or pushed from the side of b
+                free = (a not in pinned) + (b not in pinned)
+                if not free:
+                    continue
+                if distance:
+                    dx = (ax - grid.points[b][0]) / distance
+                    dy = (ay - grid.points[b][1]) / distance
+                else:
+                    dx, dy = (1.0, 0.0) if a < b else (-1.0, 0.0)
+                share = (target - distance) / free
+                if a not in pinned:
+                    px, py = pushes.get(a, (0.0, 0.0))
+                    pushes[a] = (px + dx * share, py + dy * share)
+                if b not in pinned:
+                    px, py = pushes.get(b, (0.0, 0.0))
+                    pushes[b] = (px - dx * share, py - dy * share)
+
+        active = set()
+        for dot, (px, py) in pushes.items():
+            x, y = grid.points[dot]
+            ox, oy = origin[dot]
+            nx, ny = x + px, y + py
+            displacement = math.hypot(nx - ox, ny - oy)
+            if displacement > max_displacement:
+                scale = max_displacement / displacement
+                nx, ny = ox + (nx - ox) * scale, oy + (ny - oy) * scale
+                pinned.add(dot)
+            if math.hypot(nx - x, ny - y) > settle_distance:
+                grid.move(dot, nx, ny)
+                moved.add(dot)
+                active.add(dot)
+
+        # Drop the dots that no longer collide until one is found that does,
+        # only a dot that moved can start colliding again
+        colliding |= active
+        while colliding:
+            dot = next(iter(colliding))
+            if grid.within(dot, minimal_distance):
+                break
+            colliding.discard(dot)
+
+    # Round the moved dots, undoing the pushes of any dot that ends up crowding
+    # another, and settle its neighbours again if that crowds them in turn
+    unsettled = set(moved)
+    while unsettled:
+        dot = unsettled.pop()
+        x, y = grid.points[dot]
+        ox, oy = origin[dot]
+        candidates = []
+        for fraction in settle_fractions:
+            px, py = ox + (x - ox) * fraction, oy + (y - oy) * fraction
+            rx, ry = round(px), round(py)
+            if math.hypot(rx - ox, ry - oy) > max_displacement:
+                # Rounding each coordinate towards the origin never moves it further
+                rx = math.floor(px) if px > ox else math.ceil(px)
+                ry = math.floor(py) if py > oy else math.ceil(py)
+            if (rx, ry) not in candidates:
+                candidates.append((rx, ry))
+        for candidate in candidates:
+            grid.move(dot, *candidate)
+            if not crowds(grid, origin, dot, minimal_distance):
+                break
+        else:
+            # Back where it started, it only crowds neighbours that moved
+            unsettled.update(
+                other
+                for other, _ in grid.within(dot, minimal_distance)
+                if grid.points[other] != origin[other]
+            )
+
+    for dot in list(moved):
+        dots.x[dot], dots.y[dot] = grid.points[dot]
+        if grid.points[dot] == origin[dot]:
+            moved.discard(dot)
+    return iterations, moved
@@ -0,0 +1,235 @@
+"""Drawing orders over the connections of a puzzle that retrace little."""
+
+import logging
+from collections import deque
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Above this many distinct edges the postman route falls back to greedy
+max_postman_edges = 20000
+# Up to this many odd dots are paired exactly, more are paired greedily
+exact_pairing_limit = 14
+# The nearest odd dots every odd dot considers when pairing greedily
+pairing_candidates = 8
+
+
+def optimize_route(graph, start=None, method="postman"):
+    """Return a walk that draws every connection of the graph at least once
+
+    Loops are dropped and repeated connections are drawn once, so the walk
+    only retraces a connection where the shape of the drawing requires it.
+
+    Args:
+        graph (ConnectionGraph): The connections between the dots.
+        start (int, optional): The dot to start from if the route can.
+        method (str): "postman" augments the odd dots with the shortest
+            retraces and follows an Eulerian path; "greedy" follows unused
+            connections and walks to the nearest one when it gets stuck.
+            Graphs with more than max_postman_edges edges are always routed
+            greedily, which is logged at info level.
+
+    Returns:
+        list: The dots of the walk, or [start] if there are no connections.
+    """
+    adjacency = edge_adjacency(graph.edges)
+    if not adjacency:
+        return [] if start is None else [start]
+    if start not in adjacency:
+        start = next(iter(adjacency))
+
+    edge_count = sum(len(neighbors) for neighbors in adjacency.values()) // 2
+    if method != "greedy" and edge_count > max_postman_edges:
+        logger.info(
+            "Routing %d connections greedily, the postman route is limited to %d",
+            edge_count,
+            max_postman_edges,
+        )
+        method = "greedy"
+    if method == "greedy":
+        return greedy_route(adjacency, start)
+    return postman_route(adjacency, start)
+
+
+def edge_adjacency(edges):
+    """Return the neighbours of every dot over the distinct non-loop edges"""
+    adjacency = {}
+    for a, b in edges:
+        if a != b:
+            adjacency.setdefault(a, []).append(b)
+            adjacency.setdefault(b, []).append(a)
+    return adjacency
+
+
+def shortest_path(adjacency, source, targets):
+    """Breadth-first search from source to the nearest of the targets
+
+    Returns:
+        list: The dots from source to the target, or None if no target is
+        reachable.
+    """
+    parents = {source: None}
+    queue = deque([source])
+    while queue:
+        dot = queue.popleft()
+        if dot in targets and dot != source:
+            path = []
+            while dot is not None:
+                path.append(dot)
+                dot = parents[dot]
+            return path[::-1]
+        for neighbor in adjacency[dot]:
+            if neighbor not in parents:
+                parents[neighbor] = dot
+                queue.append(neighbor)
+    return None
+
+
+def hop_distances(adjacency, source, targets, count=None):
+    """Return the hop distance from source to the targets it reaches first"""
+    distances = {}
+    seen = {source}
+    queue = deque([(source, 0)])
+    while queue:
+        dot, depth = queue.popleft()
+        if dot in targets and dot != source:
+            distances[dot] = depth
+            if count is not None and len(distances) >= count:
+                break
+        for neighbor in adjacency[dot]:
+            if neighbor not in seen:
+                seen.add(neighbor)
+                queue.append((neighbor, depth + 1))
+    return distances
+
+
+def pair_exactly(adjacency, odd):
+    """Pair all but two odd dots so that the pairs are as close as possible"""
+    distances = [hop_distances(adjacency, dot, set(odd)) for dot in odd]
+    size = len(odd)
+
+    @lru_cache(maxsize=None)
+    def best(mask, skips):
+        # The cheapest pairing of the dots in mask, leaving skips unpaired
+        if not mask:
+            return (0, ()) if skips == 0 else (float("inf"), ())
+        i = (mask & -mask).bit_length() - 1
+        rest = mask & ~(1 << i)
+        options = []
+        if skips:
+            options.append(best(rest, skips - 1))
+        for j in range(i + 1, size):
+            if rest & (1 << j) and odd[j] in distances[i]:
+                cost, pairs = best(rest & ~(1 << j), skips)
+                options.append((cost + distances[i][odd[j]], pairs + ((i, j),)))
+        return min(options, default=(float("inf"), ()))
+
+    _, pairs = best((1 << size) - 1, min(size, 2))
+    return [(odd[i], odd[j]) for i, j in pairs]
+
+
+def pair_greedily(adjacency, odd):
+    """Pair all but two odd dots, the closest candidate pairs first"""
+    targets = set(odd)
+    candidates = []
+    for dot in odd:
+        nearest = hop_distances(adjacency, dot, targets, pairing_candidates)
+        candidates.extend((distance, dot, other) for other, distance in nearest.items())
+    candidates.sort()
+
+    unpaired = dict.fromkeys(odd)
+    pairs = []
+    for _, a, b in candidates:
+        if len(unpaired) <= 2:
+            break
+        if a in unpaired and b in unpaired:
+            del unpaired[a], unpaired[b]
+            pairs.append((a, b))
+
+    # Dots whose candidates were all taken are paired with the nearest left
+    while len(unpaired) > 2:
+        a = next(iter(unpaired))
+        del unpaired[a]
+        path = shortest_path(adjacency, a, unpaired)
+        if path is None:
+            break
+        del unpaired[path[-1]]
+        pairs.append((a, path[-1]))
+    return pairs
+
+
+def postman_route(adjacency, start):
+    """Return an Eulerian path of the graph augmented with shortest retraces
+
+    The odd dots but two are paired and the shortest path between every
+    pair is added as retraced edges, which leaves at most two odd dots to
+    start and end the path at.
+    """
+    odd = [dot for dot, neighbors in adjacency.items() if len(neighbors) % 2]
+    if len(odd) <= exact_pairing_limit:
+        pairs = pair_exactly(adjacency, odd)
+    else:
+        pairs = pair_greedily(adjacency, odd)
+
+    edges = [(a, b) for a, neighbors in adjacency.items() for b in neighbors if a < b]
+    for a, b in pairs:
+        path = shortest_path(adjacency, a, {b})
+        edges.extend(zip(path, path[1:]))
+
+    incident = {dot: [] for dot in adjacency}
+    for index, (a, b) in enumerate(edges):
+        incident[a].append(index)
+        incident[b].append(index)
+    ends = [dot for dot, indices in incident.items() if len(indices) % 2]
+    if ends and start not in ends:
+        start = ends[0]
+
+    # Hierholzer's algorithm, splicing in a cycle wherever the walk got stuck
+    used = bytearray(len(edges))
+    position = dict.fromkeys(incident, 0)
+    stack = [start]
+    route = []
+    while stack:
+        dot = stack[-1]
+        indices = incident[dot]
+        i = position[dot]
+        while i < len(indices) and used[indices[i]]:
+            i += 1
+        position[dot] = i
+        if i == len(indices):
+            route.append(stack.pop())
+        else:
+            used[indices[i]] = True
+            a, b = edges[indices[i]]
+            stack.append(b if a == dot else a)
+    return route[::-1]
+
+
+def greedy_route(adjacency, start):
+    """Return a walk that follows an unused edge while there is one
+
+    When every edge at the current dot is used, the walk retraces the
+    shortest path to the nearest dot that still has unused edges.
+    """
+    unused = {dot: set(neighbors) for dot, neighbors in adjacency.items()}
+    open_dots = {dot for dot, neighbors in unused.items() if neighbors}
+    dot = start
+    route = [dot]
+    while open_dots:
+        if unused[dot]:
+            # Prefer a neighbour that can continue the walk
+            neighbor = max(unused[dot], key=lambda other: len(unused[other]))
+            unused[dot].discard(neighbor)
+            unused[neighbor].discard(dot)
+            for end in (dot, neighbor):
+                if not unused[end]:
+                    open_dots.discard(end)
+            dot = neighbor
+            route.append(dot)
+        else:
+            path = shortest_path(adjacency, dot, open_dots)
+            if path is None:
+                break  # The rest of the graph is not connected to the walk
+            route.extend(path[1:])
+            dot = path[-1]
+    return route
@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from puzzle_core import DotStatistics
+
+pytest.importorskip("numpy")
+
+
+def random_points(count, seed):
+    rng = random.Random(seed)
+    return [(rng.uniform(0, 794), rng.uniform(0, 1123)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("num_bins", [1, 7, 10])
+def test_histogram_backends_agree(seed, num_bins):
+    points = random_points(50, seed)
+    with_numpy = DotStatistics(points, use_numpy=True)
+    without_numpy = DotStatistics(points, use_numpy=False)
+    distances = list(without_numpy.step_distances())
+
+    bins, width = with_numpy.histogram(distances, num_bins)
+    assert (bins, width) == without_numpy.histogram(distances, num_bins)
+    assert sum(count for _, count in bins) == len(distances)
+
+
+def test_histogram_counts_the_highest_value_in_the_last_bin():
+    statistics = DotStatistics((), use_numpy=False)
+    bins, width = statistics.histogram([0.0, 1.0, 2.5, 10.0], 4)
+
+    assert width == 2.5
+    assert [count for _, count in bins] == [2, 1, 0, 1]